@@ -1,33 +1,72 @@
-import os
 import asyncio
+import hmac
+import os
 import pathlib
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse, JSONResponse
 from dotenv import load_dotenv
 
-from agents import Agent, Runner
-from agents.mcp import MCPServerStdio
-from agents.agent_output import AgentOutputSchema
-
 from models.schemas import QueryRequest, QueryResult
+from utils import json_codec
 from utils.logging_utils import LoggerFactory
+from utils.profiling import PROFILING_ENABLED, Profiler, new_profile_id, requested_mode
+from utils.timing import PhaseTimer
+from core.admission import AdmissionController, AdmissionRejected, lane_from_header
+from core.cache import TieredCache, cache_key, open_cache, ttl_for
 from core.direct_answer import make_direct_answer
+from core.renderers import is_router_fallback, is_simple, render
 from core.openai_config import DEFAULT_MODEL
 
+# The Agents SDK is heavy to import; it is loaded (and timed) in on_startup.
+if TYPE_CHECKING:
+    from agents.mcp import MCPServerStdio
+
 LoggerFactory.configure()
 log = LoggerFactory.get_logger("curiobot.api.main_agent")
 
 load_dotenv(override=True)
 
-app = FastAPI(title="CurioBot API (Agent-powered)", version="0.1.0")
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the shared codec (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps_bytes(content)
+
+
+app = FastAPI(
+    title="CurioBot API (Agent-powered)",
+    version="0.1.0",
+    default_response_class=CodecJSONResponse,
+)
 
 
 class AppState:
     def __init__(self) -> None:
-        self.server: MCPServerStdio | None = None
-        self.lock = asyncio.Lock()
+        self.server: "MCPServerStdio | None" = None
+        # Bounded queue in front of the agent runs; see core/admission.py.
+        self.admission = AdmissionController(
+            max_in_flight=int(os.getenv("CURIOBOT_MAX_IN_FLIGHT", "1")),
+            max_queued=int(os.getenv("CURIOBOT_MAX_QUEUED", "16")),
+            max_wait_s=float(os.getenv("CURIOBOT_MAX_QUEUE_WAIT_S", "60")),
+        )
         self.model = DEFAULT_MODEL
+        self.warmup = os.getenv("CURIOBOT_WARMUP", "false").lower() == "true"
+        self.ready = False
+        self.startup = PhaseTimer()
+        self.startup_report: Dict[str, float] = {}
+        # Warm-up phases that failed, here and in the MCP child ("mcp_" prefix).
+        self.startup_failed: List[str] = []
+        self.profiler = Profiler()
+        self.admin_token = os.getenv("CURIOBOT_ADMIN_TOKEN") or None
+        # Render weather/wiki answers from templates instead of an agent turn (core/renderers.py).
+        self.template_summaries = os.getenv("CURIOBOT_TEMPLATE_SUMMARIES", "true").lower() == "true"
+        # Final answers, shared with other workers and kept across restarts (core/cache.py).
+        # Opened in on_startup; None when disabled or the file cannot be opened.
+        self.cache: TieredCache | None = None
 
         self.instructions = """You are CurioBot, a routing and summarising assistant.
 
@@ -95,6 +134,12 @@ state = AppState()
 
 @app.on_event("startup")
 async def on_startup():
+    with state.startup.phase("cache_open"):
+        state.cache = await asyncio.to_thread(open_cache)
+
+    with state.startup.phase("import_agents_sdk"):
+        from agents.mcp import MCPServerStdio
+
     project_root = pathlib.Path(os.getcwd())
     child_env = dict(os.environ)
     child_env.setdefault("PYTHONUNBUFFERED", "1")
@@ -113,30 +158,114 @@ async def on_startup():
         "env": child_env,
     }
 
-    server = MCPServerStdio(params=params, client_session_timeout_seconds=120)
-    await server.__aenter__()
+    # Tools are static for the lifetime of the child, so list them once instead of per run.
+    # With CURIOBOT_WARMUP=true the child warms itself up before completing the handshake.
+    server = MCPServerStdio(
+        params=params,
+        client_session_timeout_seconds=120,
+        cache_tools_list=True,
+    )
+    with state.startup.phase("mcp_spawn"):
+        await server.__aenter__()
     state.server = server
     log.info("[startup] MCP server started for FastAPI")
 
+    if state.warmup:
+        state.startup_failed = await warm_up(server)
+
+    state.startup_report = state.startup.report()
+    # Without warm-up there is nothing to verify beyond the child having started.
+    state.ready = not state.startup_failed
+    log.info(
+        "[startup] ready=%s warmup=%s failed=%s report=%s",
+        state.ready, state.warmup, state.startup_failed, state.startup_report,
+    )
+
+
+async def warm_up(server: "MCPServerStdio") -> List[str]:
+    """List the MCP tools and collect the child's own warm-up result; returns failed phases."""
+    failed: List[str] = []
+    try:
+        with state.startup.phase("mcp_list_tools"):
+            await server.list_tools()
+    except Exception:
+        log.exception("[startup] listing MCP tools failed")
+        failed.append("mcp_list_tools")
+
+    # The child warmed up (router, upstream connections) before its handshake finished.
+    try:
+        with state.startup.phase("mcp_warmup_status"):
+            status = await server.read_resource("curiobot://startup")
+        child = json_codec.loads(status.contents[0].text)
+        failed += [f"mcp_{phase}" for phase in child.get("failed", [])]
+    except Exception:
+        log.exception("[startup] could not read the MCP child's warm-up status")
+        failed.append("mcp_warmup_status")
+    return failed
+
 
 @app.on_event("shutdown")
 async def on_shutdown():
     if state.server is not None:
         await state.server.__aexit__(None, None, None)
         state.server = None
+        state.ready = False
         log.info("[shutdown] MCP server stopped")
 
 
 @app.get("/health")
 async def health():
-    return {"ok": True, "model": state.model, "mcp": bool(state.server)}
+    return {
+        "ok": True,
+        "ready": state.ready,
+        "startup_failed": state.startup_failed,
+        "model": state.model,
+        "mcp": bool(state.server),
+        "startup": state.startup_report,
+        "admission": state.admission.snapshot(),
+        "cache": state.cache.snapshot() if state.cache is not None else None,
+    }
 
 
 @app.post("/query", response_model=QueryResult)
-async def query(payload: Dict[str, Any]) -> QueryResult:
+async def query(
+    payload: Dict[str, Any],
+    response: Response,
+    x_curiobot_priority: str | None = Header(default=None),
+    x_curiobot_profile: str | None = Header(default=None),
+    profile: str | None = Query(default=None),
+) -> QueryResult:
     question = (payload.get("question") or "").strip()
+    lane = lane_from_header(x_curiobot_priority)
     log.info("Question=%s", question)
 
+    mode = requested_mode(x_curiobot_profile or profile)
+    if mode is not None:
+        return await run_profiled(question, lane, response, mode)
+    return await answer(question, lane, response)
+
+
+async def run_profiled(question: str, lane: str, response: Response, mode: str) -> QueryResult:
+    """Answer `question` while sampling this process (and, for mode "all", the MCP child)."""
+    profile_id = new_profile_id()
+    meta = {"source": "api", "question": question, "lane": lane, "mode": mode}
+    # Profile and arm files are written off the event loop (acapture, to_thread).
+    async with state.profiler.acapture(profile_id, meta) as captured:
+        if captured is None:
+            response.headers["X-Profile-Status"] = "busy"
+            return await answer(question, lane, response)
+
+        response.headers["X-Profile-Id"] = profile_id
+        if mode == "all":
+            await asyncio.to_thread(state.profiler.store.arm, profile_id)
+        try:
+            return await answer(question, lane, response)
+        finally:
+            # Not claimed if the agent never called the query tool.
+            await asyncio.to_thread(state.profiler.store.disarm, profile_id)
+
+
+async def answer(question: str, lane: str, response: Response) -> QueryResult:
     if not question:
         return QueryResult(**make_direct_answer(
             summary="Please provide a question.",
@@ -151,20 +280,61 @@ async def query(payload: Dict[str, Any]) -> QueryResult:
             ok=False,
         ))
 
-    log.info("Creating Agent")
-    agent = Agent(
-        name="curiobot_router_agent",
-        instructions=state.instructions,
-        model=state.model,
-        mcp_servers=[state.server],
-        output_type=AgentOutputSchema(QueryResult, strict_json_schema=False),
-    )
+    key = None
+    if state.cache is not None:
+        key, freshness = cache_key(question)
+        cached = await state.cache.aget("result", key)
+        if cached is not None:
+            # No agent work, so no admission slot either.
+            response.headers["X-Cache"] = "hit"
+            log.info("Answered from cache freshness=%s", freshness)
+            result = QueryResult(**cached)
+            log_result(result)
+            return result
+        response.headers["X-Cache"] = "miss"
+
+    try:
+        async with state.admission.slot(lane) as wait_ms:
+            log.info("Running Agent lane=%s wait_ms=%.1f", lane, wait_ms)
+            # Lets load tools (scripts/replay_traffic.py) separate queueing from service time.
+            response.headers["X-Queue-Wait-Ms"] = f"{wait_ms:.1f}"
+            result, prefetched = None, None
+            if state.template_summaries and is_simple(question):
+                result, prefetched = await answer_from_template(question)
+            if result is None:
+                result = await run_agent(question, prefetched)
+    except AdmissionRejected as e:
+        log.warning("Rejected lane=%s reason=%s retry_after=%ss", lane, e.reason, e.retry_after_s)
+        return CodecJSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(e.retry_after_s)},
+            content=make_direct_answer(
+                summary="CurioBot is busy right now, please try again shortly.",
+                reason=e.reason,
+                ok=False,
+                extra_raw={"retry_after_s": e.retry_after_s},
+            ),
+        )
+
+    log_result(result)
+    if key is not None and cacheable(result):
+        await state.cache.aset("result", key, result.model_dump(), ttl_for(question, result.tool))
+    return result
+
+
+def cacheable(result: QueryResult) -> bool:
+    """
+    Only answers built from a tool's data. Errors (no location, upstream
+    failures, ...) are retried next time, and direct answers are left out like
+    in the MCP plan cache: they may be time-sensitive, and a router fallback
+    is a failure rather than an answer.
+    """
+    if result.tool == "direct_answer":
+        return False
+    return not (result.raw_tool_output and result.raw_tool_output.get("ok") is False)
 
-    log.info("Running Agent")
-    async with state.lock:
-        run_result = await Runner.run(agent, input=question)
-        result: QueryResult = run_result.final_output
 
+def log_result(result: QueryResult) -> None:
     log.info("Agent tool=%s", result.tool)
     log.info("Agent args=%s", result.args)
     log.info("Agent summary=%s", result.summary)
@@ -173,4 +343,84 @@ async def query(payload: Dict[str, Any]) -> QueryResult:
         list(result.raw_tool_output.keys()) if result.raw_tool_output else None,
     )
 
-    return result
+
+async def answer_from_template(question: str) -> Tuple[QueryResult | None, Dict[str, Any] | None]:
+    """
+    Call the MCP `query` tool directly and render its result without an LLM turn.
+
+    Returns (result, None) when a template applies, otherwise (None, the `query`
+    response if one was fetched) so the agent can summarise it without calling again.
+    """
+    try:
+        call = await state.server.call_tool("query", {"question": question})
+        payload = json_codec.loads(call.content[0].text)
+    except Exception:
+        log.exception("Template path: query tool call failed; using the agent")
+        return None, None
+    if call.isError or not isinstance(payload, dict):
+        log.warning("Template path: query tool returned an error; using the agent")
+        return None, None
+
+    plan = payload.get("plan") or {}
+    if is_router_fallback(plan):
+        # The router failed on this question; let the agent start over rather than reuse it.
+        log.info("Template path: router fell back (%s); using the agent", plan.get("reason"))
+        return None, None
+    rendered = render(plan, payload.get("result"))
+    if rendered is None:
+        log.info("Template path: no template for tool=%s; using the agent", plan.get("tool"))
+        return None, payload
+    log.info("Answered from template tool=%s", rendered["tool"])
+    return QueryResult(**rendered), None
+
+
+async def run_agent(question: str, prefetched: Dict[str, Any] | None = None) -> QueryResult:
+    from agents import Agent, Runner
+    from agents.agent_output import AgentOutputSchema
+
+    log.info("Creating Agent")
+    agent = Agent(
+        name="curiobot_router_agent",
+        instructions=state.instructions,
+        model=state.model,
+        mcp_servers=[state.server],
+        output_type=AgentOutputSchema(QueryResult, strict_json_schema=False),
+    )
+
+    agent_input = question
+    if prefetched is not None:
+        # The template path already paid for routing and the fetch; hand the agent that response.
+        agent_input = (
+            f"{question}\n\n"
+            "The MCP `query` tool has already been called for this question. "
+            "Do not call it again; build the QueryResult from this response:\n"
+            f"{json_codec.dumps(prefetched)}"
+        )
+    run_result = await Runner.run(agent, input=agent_input)
+    return run_result.final_output
+
+
+def _check_admin(token: str | None) -> None:
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="profiling is disabled (CURIOBOT_PROFILING=true)")
+    # Profile metadata includes the raw question, so the endpoints are never open.
+    if not state.admin_token:
+        raise HTTPException(status_code=403, detail="admin endpoints need CURIOBOT_ADMIN_TOKEN to be set")
+    if not hmac.compare_digest(token or "", state.admin_token):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: str | None = Header(default=None)):
+    _check_admin(x_admin_token)
+    return {"profiles": await asyncio.to_thread(state.profiler.store.list)}
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_admin_token: str | None = Header(default=None)):
+    """Collapsed-stack profile, ready for flamegraph.pl or speedscope."""
+    _check_admin(x_admin_token)
+    path = state.profiler.store.path_for(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
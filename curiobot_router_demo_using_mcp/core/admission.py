@@ -0,0 +1,154 @@
+import asyncio
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from utils.stats import latency_summary
+
+# Lanes in priority order: a free slot always goes to the first non-empty lane.
+LANES: Tuple[str, ...] = ("interactive", "batch")
+# Untagged clients (scripts, curl) must not compete with the UI, which sends "interactive".
+DEFAULT_LANE = "batch"
+
+# Assumed service time until real requests have been measured.
+_INITIAL_SERVICE_S = 5.0
+_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint (seconds)."""
+
+    def __init__(self, reason: str, retry_after_s: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    """
+    Bounded admission queue with priority lanes for /query.
+
+    At most `max_in_flight` requests run at once and at most `max_queued` wait
+    for a slot; anything beyond that is rejected immediately so clients can back
+    off instead of piling up until they time out. A request that has waited
+    longer than `max_wait_s` is rejected as well, since its caller has most
+    likely given up already. When the queue is full, an arrival in a higher
+    lane takes the place of the newest waiter of the lowest non-empty lower
+    lane, which is rejected instead; a full queue never blocks interactive
+    requests behind batch ones.
+
+    Usage:
+        async with admission.slot("interactive") as wait_ms:
+            ...
+    """
+
+    def __init__(self, max_in_flight: int = 1, max_queued: int = 16, max_wait_s: float = 60.0) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.max_wait_s = max_wait_s
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._service_s = _INITIAL_SERVICE_S
+        self._recent_waits_ms: Deque[float] = deque(maxlen=500)
+        self.counters: Counter = Counter()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    def retry_after(self) -> int:
+        """Seconds until a new request would likely get a slot, from the service-time average."""
+        backlog = self.queued + self.in_flight
+        return max(1, math.ceil(self._service_s * backlog / self.max_in_flight))
+
+    @asynccontextmanager
+    async def slot(self, lane: str = DEFAULT_LANE) -> AsyncIterator[float]:
+        """Hold one in-flight slot for the body; yields the queueing delay in ms."""
+        lane = lane if lane in self._waiters else DEFAULT_LANE
+        queued_at = time.perf_counter()
+        await self._acquire(lane)
+        wait_ms = (time.perf_counter() - queued_at) * 1000
+        self._recent_waits_ms.append(wait_ms)
+        self.counters[f"admitted_{lane}"] += 1
+
+        started = time.perf_counter()
+        try:
+            yield wait_ms
+        finally:
+            elapsed = time.perf_counter() - started
+            self._service_s += _EWMA_ALPHA * (elapsed - self._service_s)
+            self._release()
+
+    async def _acquire(self, lane: str) -> None:
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            return
+        if self.queued >= self.max_queued and not self._preempt(lane):
+            self.counters["rejected_full"] += 1
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            # The slot is handed over by _release(), which also counts it in in_flight.
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait_s)
+        except asyncio.TimeoutError:
+            self._abandon(lane, waiter)
+            self.counters["rejected_timeout"] += 1
+            raise AdmissionRejected("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # Client went away while queued.
+            self._abandon(lane, waiter)
+            raise
+
+    def _preempt(self, lane: str) -> bool:
+        """Reject the newest waiter of the lowest lane below `lane`; False if there is none."""
+        for lower in reversed(LANES[LANES.index(lane) + 1:]):
+            queue = self._waiters[lower]
+            while queue:
+                waiter = queue.pop()
+                if not waiter.done():
+                    self.counters[f"preempted_{lower}"] += 1
+                    waiter.set_exception(AdmissionRejected("queue_full", self.retry_after()))
+                    return True
+        return False
+
+    def _abandon(self, lane: str, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+            # Lost the race: the slot was already handed to us, pass it on.
+            self._release()
+        else:
+            waiter.cancel()
+            if waiter in self._waiters[lane]:
+                self._waiters[lane].remove(waiter)
+
+    def _release(self) -> None:
+        for lane in LANES:
+            queue = self._waiters[lane]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)  # slot transferred; in_flight unchanged
+                    return
+        self.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count, recent queueing delay and counters for /health."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": {lane: len(q) for lane, q in self._waiters.items()},
+            "max_queued": self.max_queued,
+            "wait_ms": latency_summary(self._recent_waits_ms),
+            "service_s_avg": round(self._service_s, 2),
+            "retry_after_s": self.retry_after(),
+            "counters": dict(self.counters),
+        }
+
+
+def lane_from_header(value: Optional[str]) -> str:
+    """Map an X-CurioBot-Priority header value to a lane (unknown values → default lane)."""
+    value = (value or "").strip().lower()
+    return value if value in LANES else DEFAULT_LANE
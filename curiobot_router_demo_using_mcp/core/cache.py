@@ -0,0 +1,271 @@
+import asyncio
+import datetime as dt
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from utils import json_codec
+from utils.logging_utils import LoggerFactory
+
+log = LoggerFactory.get_logger("curiobot.cache")
+
+# Two-tier answer cache shared by the API and the MCP child (and any extra
+# uvicorn workers): a small in-process LRU in front of one SQLite file in WAL
+# mode, which several processes can read and write concurrently. Entries
+# survive --reload restarts, so a new process starts warm.
+
+CACHE_ENABLED = os.getenv("CURIOBOT_CACHE", "false").lower() == "true"
+CACHE_PATH = os.getenv("CURIOBOT_CACHE_PATH", os.path.join("data", "curiobot_cache.sqlite"))
+CACHE_L1_SIZE = int(os.getenv("CURIOBOT_CACHE_L1_SIZE", "512"))
+
+# How long an L2 call waits for another process's write lock before counting as
+# an error (i.e. a miss): a cache that stalls requests is worse than no cache.
+L2_BUSY_TIMEOUT_S = 0.5
+
+# How long an answer stays valid, by how fast its source changes.
+FRESHNESS_TTL_S: Dict[str, float] = {
+    "news": float(os.getenv("CURIOBOT_CACHE_TTL_NEWS_S", "600")),
+    "weather": float(os.getenv("CURIOBOT_CACHE_TTL_WEATHER_S", "1800")),
+    "reference": float(os.getenv("CURIOBOT_CACHE_TTL_REFERENCE_S", "86400")),
+}
+# Classes whose answers are about "today"/"tomorrow": the date is part of the key.
+_DATED_CLASSES = ("news", "weather")
+_TOOL_CLASSES = {"get_news": "news", "get_weather": "weather"}
+
+# Keyword checks rather than the predictor: the class (and so the key) must not
+# depend on capitalisation or phrasing details. Misfiring only shortens a TTL.
+_NEWS_WORDS = re.compile(r"\b(news|headlines?|latest|breaking|updates?|announce\w*|today'?s)\b", re.IGNORECASE)
+_WEATHER_WORDS = re.compile(
+    r"\b(weather|forecast|temperature|rain\w*|snow\w*|umbrella|sunny|humid\w*|wind\w*)\b", re.IGNORECASE
+)
+
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'"})
+_TRAILING = re.compile(r"[\s?!.]+$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at);
+"""
+
+
+def normalise_question(question: str) -> str:
+    """Case, whitespace, curly quotes and trailing punctuation do not change the answer."""
+    text = " ".join(question.translate(_APOSTROPHES).lower().split())
+    return _TRAILING.sub("", text)
+
+
+def freshness_class(question: str, tool: Optional[str] = None) -> str:
+    """'news', 'weather' or 'reference', from the answering tool or, before answering, the question."""
+    if tool is not None:
+        return _TOOL_CLASSES.get(tool, "reference")
+    if _WEATHER_WORDS.search(question):
+        return "weather"
+    if _NEWS_WORDS.search(question):
+        return "news"
+    return "reference"
+
+
+def cache_key(question: str) -> Tuple[str, str]:
+    """(key, freshness class) for a question; dated classes include today's date."""
+    cls = freshness_class(question)
+    parts = [cls, normalise_question(question)]
+    if cls in _DATED_CLASSES:
+        parts.insert(1, dt.date.today().isoformat())
+    return "|".join(parts), cls
+
+
+class MemoryCache:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = CACHE_L1_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Tuple[Optional[Any], float]:
+        """(value, expires_at), or (None, 0) on a miss."""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None, 0.0
+            if entry[0] <= time.time():
+                del self._entries[(namespace, key)]
+                return None, 0.0
+            self._entries.move_to_end((namespace, key))
+            return entry[1], entry[0]
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = (expires_at, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    On-disk cache in SQLite WAL mode: readers never block the writer, and
+    every local process opening the same file sees the same entries.
+    """
+
+    PURGE_EVERY = 500  # writes between sweeps of expired rows
+
+    def __init__(self, path: str = CACHE_PATH) -> None:
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(
+            path, timeout=L2_BUSY_TIMEOUT_S, check_same_thread=False, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # The cache can be rebuilt; losing the last writes on power loss is fine.
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get(self, namespace: str, key: str) -> Tuple[Optional[Any], float]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None, 0.0
+        return json_codec.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        payload = json_codec.dumps(value)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, payload, expires_at),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self.conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self.conn.execute("DELETE FROM cache")
+            else:
+                self.conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+
+class TieredCache:
+    """
+    L1 (MemoryCache) in front of L2 (SQLiteCache). Reads fall through to L2
+    and promote hits into L1; writes go to both. L2 errors (locked or
+    unreadable file) are counted and treated as misses, never raised.
+
+    Async code uses aget()/aset(), which run the L2 part in a worker thread so
+    a slow disk or a locked file never blocks the event loop.
+    """
+
+    def __init__(self, l1: Optional[MemoryCache] = None, l2: Optional[SQLiteCache] = None) -> None:
+        self.l1 = l1 or MemoryCache()
+        self.l2 = l2
+        self.stats: Counter = Counter()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        value = self._l1_get(namespace, key)
+        if value is None and self.l2 is not None:
+            value = self._l2_get(namespace, key)
+        if value is None:
+            self.stats[f"{namespace}_misses"] += 1
+        return value
+
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        value = self._l1_get(namespace, key)
+        if value is None and self.l2 is not None:
+            value = await asyncio.to_thread(self._l2_get, namespace, key)
+        if value is None:
+            self.stats[f"{namespace}_misses"] += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl_s: float) -> None:
+        expires_at = self._l1_set(namespace, key, value, ttl_s)
+        if self.l2 is not None:
+            self._l2_set(namespace, key, value, expires_at)
+
+    async def aset(self, namespace: str, key: str, value: Any, ttl_s: float) -> None:
+        expires_at = self._l1_set(namespace, key, value, ttl_s)
+        if self.l2 is not None:
+            await asyncio.to_thread(self._l2_set, namespace, key, value, expires_at)
+
+    def _l1_get(self, namespace: str, key: str) -> Optional[Any]:
+        value, _ = self.l1.get(namespace, key)
+        if value is not None:
+            self.stats[f"{namespace}_l1_hits"] += 1
+        return value
+
+    def _l2_get(self, namespace: str, key: str) -> Optional[Any]:
+        try:
+            value, expires_at = self.l2.get(namespace, key)
+        except sqlite3.Error:
+            self.stats["l2_errors"] += 1
+            return None
+        if value is not None:
+            self.l1.set(namespace, key, value, expires_at)
+            self.stats[f"{namespace}_l2_hits"] += 1
+        return value
+
+    def _l1_set(self, namespace: str, key: str, value: Any, ttl_s: float) -> float:
+        expires_at = time.time() + ttl_s
+        self.l1.set(namespace, key, value, expires_at)
+        self.stats[f"{namespace}_sets"] += 1
+        return expires_at
+
+    def _l2_set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        try:
+            self.l2.set(namespace, key, value, expires_at)
+        except sqlite3.Error:
+            self.stats["l2_errors"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "l1_entries": len(self.l1),
+            "l2_path": self.l2.path if self.l2 is not None else None,
+            **dict(self.stats),
+        }
+
+
+def ttl_for(question: str, tool: Optional[str]) -> float:
+    """TTL of an answer: the shorter of the question's and the answering tool's class."""
+    return min(FRESHNESS_TTL_S[freshness_class(question)], FRESHNESS_TTL_S[freshness_class(question, tool)])
+
+
+def open_cache(path: str = CACHE_PATH) -> Optional[TieredCache]:
+    """
+    The shared cache, or None when CURIOBOT_CACHE is off or the file cannot be
+    opened (the error is logged; callers run uncached). Blocking: call it from
+    startup code, in a worker thread.
+    """
+    if not CACHE_ENABLED:
+        return None
+    try:
+        return TieredCache(MemoryCache(), SQLiteCache(path))
+    except (sqlite3.Error, OSError):
+        log.exception("cache: could not open %s; running without the cache", path)
+        return None
@@ -18,3 +18,18 @@ def make_direct_answer(
         "summary": summary,
         "raw_tool_output": {"ok": ok, **(extra_raw or {})},
     }
+
+
+def make_tool_result(
+    tool: str,
+    args: Dict[str, Any],
+    summary: str,
+    raw: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Same QueryResult shape for an answer built from a tool's output (see core/renderers.py)."""
+    return {
+        "tool": tool,
+        "args": args,
+        "summary": summary,
+        "raw_tool_output": raw,
+    }
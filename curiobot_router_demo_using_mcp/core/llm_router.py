@@ -1,15 +1,63 @@
+import ast
 import os
-import json
-from typing import Any, Dict, List, Optional, Literal
+import re
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Literal, Tuple
 
+from utils import json_codec
 from utils.logging_utils import LoggerFactory
-from core.openai_config import make_openai_client, DEFAULT_MODEL
-from core.routing_types import RouterPlan
+from utils.stats import latency_summary
+from core.openai_config import (
+    DEFAULT_MODEL,
+    ROUTER_ESCALATE_BELOW,
+    ROUTER_FAST_API_KEY,
+    ROUTER_FAST_BASE_URL,
+    ROUTER_FAST_MODEL,
+    make_openai_client,
+)
+from core.routing_types import BUILTIN_TOOL_ARGS, RouterPlan, plan_schema
 
 log = LoggerFactory.get_logger("curiobot.router")
 
 Provider = Literal["openai"]
 
+# A plan for these tools is only usable if at least one of the listed args is set.
+REQUIRED_ARGS: Dict[str, Tuple[str, ...]] = {
+    "get_weather": ("location", "locations"),
+    "get_news": ("query", "topic"),
+    "get_wiki": ("topic",),
+}
+
+# Log a tier summary (escalation rate, per-tier latency) every N routing decisions.
+STATS_LOG_EVERY = 50
+
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def repair_json(content: str) -> Optional[Dict[str, Any]]:
+    """
+    Recover a JSON object from a near-valid reply: markdown fences, prose around
+    the object, trailing commas, or a Python-style dict (single quotes,
+    True/None). Returns None if nothing usable is left.
+    """
+    text = _FENCE.sub("", content)
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    text = _TRAILING_COMMA.sub(r"\1", text[start:end + 1])
+    try:
+        value = json_codec.loads(text)
+    except ValueError:
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return None
+    return value if isinstance(value, dict) else None
+
 
 class LLMRouter:
     """Simple LLM-based router that chooses one of the supported tools.
@@ -18,23 +66,96 @@ class LLMRouter:
       {
         "tool": "get_news" | "get_weather" | "get_wiki" | "direct_answer" | "none",
         "args": { ... },
-        "reason": "why this tool"
+        "reason": "why this tool",
+        "confidence": 0.0 - 1.0
       }
+
+    With a fast tier configured (ROUTER_FAST_MODEL), the small model decides
+    first and the plan is only re-routed with the main model when its confidence
+    is below the escalation threshold or the plan fails validation.
     """
 
-    def __init__(self, provider: Optional[Provider] = None) -> None:
+    def __init__(
+        self,
+        provider: Optional[Provider] = None,
+        client: Any = None,
+        model: Optional[str] = None,
+        fast_client: Any = None,
+        fast_model: Optional[str] = None,
+        escalate_below: Optional[float] = None,
+        tool_args: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        """`client`/`model` override the configured OpenAI client and model
+        (e.g. a local OpenAI-compatible stub or a recorded-response fixture);
+        `fast_client`/`fast_model` do the same for the fast tier.
+
+        `tool_args` maps each tool to the JSON schema of its args (see
+        routing_types.args_schema); with it, plans are requested as strict
+        structured output and args are checked against the tool's schema.
+        """
         self.provider: Provider = (provider or os.getenv("MODEL_PROVIDER", "openai")).lower()  # type: ignore[assignment]
+        self.stats: Counter = Counter()
+        self.tier_latency_ms: Dict[str, Deque[float]] = {
+            "fast": deque(maxlen=1000),
+            "main": deque(maxlen=1000),
+        }
+        self.escalate_below = ROUTER_ESCALATE_BELOW if escalate_below is None else escalate_below
+        self.tool_args = {**tool_args, **BUILTIN_TOOL_ARGS} if tool_args else None
+        self.response_format = plan_schema(tool_args) if tool_args else JSON_OBJECT_FORMAT
+        # Tiers whose endpoint rejected json_schema output; they use json_object from then on.
+        self.schema_unsupported: set = set()
         log.info("LLMRouter init: provider=%s", self.provider)
-        self._init_client(self.provider)
+        self._init_client(self.provider, client=client, model=model)
+        self._init_fast_tier(fast_client, fast_model)
 
-    def _init_client(self, provider: str) -> None:
+    def _init_client(self, provider: str, client: Any = None, model: Optional[str] = None) -> None:
         if provider == "openai":
             log.info("LLMRouter: initializing OpenAI client")
-            self.client = make_openai_client()
-            self.model: str = DEFAULT_MODEL
+            self.client = client or make_openai_client()
+            self.model: str = model or DEFAULT_MODEL
         else:
             raise ValueError(f"Invalid provider: {provider}")
 
+    def _init_fast_tier(self, client: Any = None, model: Optional[str] = None) -> None:
+        # model=None means "use ROUTER_FAST_MODEL"; an empty string disables the fast tier.
+        self.fast_model: Optional[str] = (ROUTER_FAST_MODEL if model is None else model) or None
+        self.fast_client: Any = None
+        if not self.fast_model:
+            return
+        if client is not None:
+            self.fast_client = client
+        elif ROUTER_FAST_BASE_URL:
+            self.fast_client = make_openai_client(base_url=ROUTER_FAST_BASE_URL, api_key=ROUTER_FAST_API_KEY)
+        else:
+            self.fast_client = self.client
+        log.info(
+            "LLMRouter fast tier: model=%s base_url=%s escalate_below=%.2f",
+            self.fast_model, ROUTER_FAST_BASE_URL or "(main endpoint)", self.escalate_below,
+        )
+
+    def warmup(self) -> List[str]:
+        """Issue a tiny completion so TLS, connection pool and model are warm.
+
+        Used by the opt-in startup warm-up; failures are logged, never raised.
+        Returns the models whose warm-up call failed.
+        """
+        tiers = [(self.client, self.model)]
+        if self.fast_client is not None:
+            tiers.insert(0, (self.fast_client, self.fast_model))
+        failed = []
+        for client, model in tiers:
+            try:
+                client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": "ping"}],
+                    max_tokens=1,
+                )
+                log.info("LLMRouter warm-up call completed (model=%s)", model)
+            except Exception:
+                log.exception("LLMRouter warm-up call failed (model=%s)", model)
+                failed.append(model)
+        return failed
+
     def route(
         self,
         question: str,
@@ -47,7 +168,8 @@ class LLMRouter:
           {
             "tool": "get_news" | "get_weather" | "get_wiki" | "direct_answer" | "none",
             "args": { ... },
-            "reason": "string"
+            "reason": "string",
+            "confidence": float | None
           }
         """
 
@@ -61,6 +183,18 @@ class LLMRouter:
         log.info("LLMRouter.route called for question=%s", question)
         log.info("LLMRouter.provider=%s", self.provider)
 
+        if self.provider != "openai":
+            raise RuntimeError(f"Unsupported provider in route(): {self.provider}")
+
+        messages = self._messages(question, max_depth)
+        self.stats["routes"] += 1
+        try:
+            return self._route_tiered(messages)
+        finally:
+            if self.stats["routes"] % STATS_LOG_EVERY == 0:
+                log.info("LLMRouter tier summary=%s", self.tier_summary())
+
+    def _messages(self, question: str, max_depth: int) -> List[Dict[str, str]]:
         tools: List[str] = ["get_wiki", "get_news", "get_weather"]
 
         system_prompt = (
@@ -68,9 +202,13 @@ class LLMRouter:
             f"Available tools: {', '.join(tools)}. "
             f"You may call tools up to {max_depth} times (though you normally only need one decision). "
             "Return ONLY strict JSON on one line using this schema: "
-            "{\"tool\": \"string\", \"args\": {}, \"reason\": \"string\"}. "
+            "{\"tool\": \"string\", \"args\": {}, \"reason\": \"string\", \"confidence\": 0.0}. "
+            "confidence is a number from 0 to 1: how sure you are that tool and args are right. "
+            "For get_weather use args {\"location\": \"...\", \"when\": \"today|tomorrow\"}; "
+            "if the question compares several places, use {\"locations\": [\"...\", \"...\"], \"when\": \"...\"} "
+            "in a single call. "
             "If no tool fits and the LLM should answer directly, use: "
-            "{\"tool\": \"direct_answer\", \"args\": {\"answer\": \"...\"}, \"reason\": \"...\"}."
+            "{\"tool\": \"direct_answer\", \"args\": {\"answer\": \"...\"}, \"reason\": \"...\", \"confidence\": 0.0}."
         )
 
         user_prompt = (
@@ -78,35 +216,139 @@ class LLMRouter:
             "Return only the JSON object, no other text."
         ).format(question=question)
 
-        if self.provider == "openai":
-            from openai import OpenAI  # imported here to keep core/openai_config minimal
-            log.info("LLMRouter - Calling OpenAI LLM with model=%s", self.model)
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                response_format={"type": "json_object"},
-            )
-
-            content = response.choices[0].message.content
-            log.debug("LLMRouter raw content: %s", content)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
 
+    def _route_tiered(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        if self.fast_client is not None:
             try:
-                raw = json.loads(content or "{}")
-                plan = RouterPlan.model_validate(raw)
-                normalised = plan.model_dump()
-                log.info("LLMRouter plan=%s", normalised)
-                return normalised
+                plan, content, error = self._ask("fast", self.fast_client, self.fast_model, messages, check_args=True)
             except Exception as e:
-                log.exception("LLMRouter failed to parse JSON plan; falling back. content=%r", content)
-                # Fallback: treat the content as a direct answer
-                fallback = RouterPlan(
-                    tool="direct_answer",
-                    args={"answer": content or "I could not decide which tool to use."},
-                    reason=f"fallback due to parse error: {e}",
-                )
-                return fallback.model_dump()
+                # An unreachable or failing fast tier must not fail the request; the main model decides.
+                plan, error = None, f"{type(e).__name__}: {e}"
+                reason = "error"
+            else:
+                reason = "invalid"
+            if plan is not None:
+                confidence = plan.get("confidence")
+                if confidence is not None and confidence >= self.escalate_below:
+                    self.stats["fast_accepted"] += 1
+                    log.info("LLMRouter plan=%s tier=fast", plan)
+                    return plan
+                reason = "low_confidence" if confidence is not None else "no_confidence"
+            self.stats["escalations"] += 1
+            self.stats[f"escalations_{reason}"] += 1
+            log.info(
+                "LLMRouter escalating to model=%s reason=%s fast_error=%s",
+                self.model, reason, error,
+            )
+
+        plan, content, error = self._ask("main", self.client, self.model, messages)
+        if plan is None:
+            # One re-ask with the error, before giving up on the request.
+            self.stats["reasks"] += 1
+            log.info("LLMRouter re-asking model=%s error=%s", self.model, error)
+            plan, content, error = self._ask("main", self.client, self.model, self._reask(messages, content, error))
+        if plan is not None:
+            log.info("LLMRouter plan=%s tier=main", plan)
+            return plan
+
+        self.stats["parse_fallbacks"] += 1
+        log.error("LLMRouter failed to parse JSON plan; falling back. error=%s content=%r", error, content)
+        # Fallback: treat the content as a direct answer
+        fallback = RouterPlan(
+            tool="direct_answer",
+            args={"answer": content or "I could not decide which tool to use."},
+            reason=f"fallback due to parse error: {error}",
+        )
+        return fallback.model_dump()
+
+    @staticmethod
+    def _reask(messages: List[Dict[str, str]], content: Optional[str], error: Optional[str]) -> List[Dict[str, str]]:
+        # Repeats the question line so recorded-response fixtures can still match it.
+        return messages + [
+            {"role": "assistant", "content": content or ""},
+            {"role": "user", "content": (
+                f"That reply was not a valid plan ({error}).\n"
+                f"{messages[-1]['content']}"
+            )},
+        ]
+
+    def _complete(self, tier: str, client: Any, model: str, messages: List[Dict[str, str]]) -> Any:
+        response_format = JSON_OBJECT_FORMAT if tier in self.schema_unsupported else self.response_format
+        try:
+            return client.chat.completions.create(model=model, messages=messages, response_format=response_format)
+        except Exception as e:
+            # Endpoints (older models, local servers) without json_schema support answer 400.
+            if response_format is JSON_OBJECT_FORMAT or getattr(e, "status_code", None) != 400:
+                raise
+            self.schema_unsupported.add(tier)
+            log.warning("LLMRouter tier=%s model=%s rejected json_schema output (%s); using json_object", tier, model, e)
+            return client.chat.completions.create(model=model, messages=messages, response_format=JSON_OBJECT_FORMAT)
+
+    def _ask(
+        self,
+        tier: str,
+        client: Any,
+        model: str,
+        messages: List[Dict[str, str]],
+        check_args: bool = False,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
+        """One routing call on `tier`; returns (validated plan or None, raw content, error).
+
+        With `check_args`, a plan missing the args its tool needs counts as invalid
+        (used to decide escalation; the main tier's plan is taken as is).
+        """
+        log.info("LLMRouter - Calling OpenAI LLM with model=%s tier=%s", model, tier)
+        # Counted before the call so failed calls still count towards the escalation rate.
+        self.stats["calls"] += 1
+        self.stats[f"{tier}_calls"] += 1
+        start = time.perf_counter()
+        response = self._complete(tier, client, model, messages)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.tier_latency_ms[tier].append(latency_ms)
+
+        content = response.choices[0].message.content
+        log.debug("LLMRouter raw content: %s", content)
+        log.info("LLMRouter tier=%s model=%s latency_ms=%.1f", tier, model, latency_ms)
+
+        try:
+            raw = json_codec.loads(content or "{}")
+        except ValueError as e:
+            raw = repair_json(content or "")
+            if raw is None:
+                return None, content, f"{type(e).__name__}: {e}"
+            self.stats["repairs"] += 1
+            log.info("LLMRouter repaired near-valid JSON from tier=%s", tier)
+        try:
+            plan = RouterPlan.model_validate(raw).model_dump()
+        except Exception as e:
+            return None, content, f"{type(e).__name__}: {e}"
+
+        # Structured output sends unused optional args as null; tools expect them absent.
+        plan["args"] = {key: value for key, value in plan["args"].items() if value is not None}
+        schema = self.tool_args.get(plan["tool"]) if self.tool_args else None
+        if schema is not None:
+            unknown = set(plan["args"]) - set(schema["properties"])
+            if unknown:
+                return None, content, f"unknown args for {plan['tool']}: {sorted(unknown)}"
+
+        required = REQUIRED_ARGS.get(plan["tool"]) if check_args else None
+        if required and not any(plan["args"].get(arg) for arg in required):
+            return None, content, f"missing args for {plan['tool']}: one of {list(required)}"
+        return plan, content, None
 
-        raise RuntimeError(f"Unsupported provider in route(): {self.provider}")
+    def tier_summary(self) -> Dict[str, Any]:
+        """Escalation rate and per-tier latency percentiles so far."""
+        fast_calls = self.stats["fast_calls"]
+        return {
+            "routes": self.stats["routes"],
+            "escalation_rate": round(self.stats["escalations"] / fast_calls, 3) if fast_calls else None,
+            "escalations": {
+                key.removeprefix("escalations_"): value
+                for key, value in self.stats.items() if key.startswith("escalations_")
+            },
+            "latency_ms": {tier: latency_summary(values) for tier, values in self.tier_latency_ms.items()},
+        }
@@ -0,0 +1,125 @@
+import re
+import zlib
+from typing import Any, Dict, List, Sequence, Set
+
+# 2**61 - 1, a Mersenne prime for the (a * x + b) mod p hash family.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_THRESHOLD = 0.5
+
+
+def _permutations(num_perm: int, seed: int = 1) -> List[tuple]:
+    # Deterministic (a, b) pairs so signatures are stable across processes.
+    params = []
+    state = seed
+    for _ in range(num_perm):
+        state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        a = (state >> 3) % _PRIME or 1
+        state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        b = (state >> 3) % _PRIME
+        params.append((a, b))
+    return params
+
+
+_PERMS = _permutations(DEFAULT_NUM_PERM)
+
+
+def shingles(text: str, k: int = 3) -> Set[str]:
+    """Word k-shingles of lower-cased text with punctuation dropped."""
+    words = _WORD.findall(text.lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def minhash(features: Set[str], perms: Sequence[tuple] = _PERMS) -> List[int]:
+    """MinHash signature of a shingle set (empty set → all-max signature)."""
+    hashes = [zlib.crc32(f.encode("utf-8")) for f in features]
+    if not hashes:
+        return [_MAX_HASH] * len(perms)
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in perms]
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def _text(article: Dict[str, Any]) -> str:
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+def _completeness(article: Dict[str, Any]) -> int:
+    """Prefer the copy carrying the most information for the summariser."""
+    return sum(len(article.get(key) or "") for key in ("title", "description", "content"))
+
+
+def is_removed(article: Dict[str, Any]) -> bool:
+    """NewsAPI placeholder for articles taken down after indexing."""
+    return (article.get("title") or "").strip() == "[Removed]"
+
+
+def cluster_articles(
+    articles: List[Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[List[int]]:
+    """
+    Group near-identical articles (syndicated copies, lightly edited rewrites).
+
+    Articles are compared on MinHash signatures of their title + description
+    shingles; pairs at or above `threshold` end up in the same cluster
+    (single-link, via union-find). Articles with no words in either field have
+    nothing to compare and stay stories of their own. Clusters are returned in
+    order of their first article, each as a list of indices into `articles`.
+    """
+    features = [shingles(_text(a)) for a in articles]
+    signatures = [minhash(f) if f else None for f in features]
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Result pages are small (tens of articles), so all pairs is cheap.
+    comparable = [i for i, sig in enumerate(signatures) if sig is not None]
+    for n, i in enumerate(comparable):
+        for j in comparable[n + 1:]:
+            if similarity(signatures[i], signatures[j]) >= threshold:
+                parent[find(j)] = find(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def dedupe_articles(
+    articles: List[Dict[str, Any]],
+    top_k: int,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Return up to `top_k` distinct stories from `articles` (kept in their original
+    order, e.g. newest first).
+
+    Each cluster of near-duplicates is represented by its most complete copy,
+    annotated with `duplicates` (how many copies were collapsed) and
+    `also_reported_by` (the other sources), so coverage is not lost.
+    """
+    articles = [a for a in articles if not is_removed(a)]
+    distinct = []
+    for members in cluster_articles(articles, threshold)[:top_k]:
+        best = max(members, key=lambda i: (_completeness(articles[i]), -i))
+        representative = dict(articles[best])
+        others = [articles[i] for i in members if i != best]
+        if others:
+            representative["duplicates"] = len(others)
+            sources = {(a.get("source") or {}).get("name") for a in others}
+            representative["also_reported_by"] = sorted(s for s in sources if s)
+        distinct.append(representative)
+    return distinct
@@ -1,13 +1,35 @@
 import os
-from openai import OpenAI
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 DEFAULT_BASE_URL = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
 DEFAULT_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Optional fast routing tier (see LLMRouter): a small model, optionally on its own
+# OpenAI-compatible endpoint, decides first; plans below ROUTER_ESCALATE_BELOW
+# confidence (or invalid ones) are re-routed with DEFAULT_MODEL.
+ROUTER_FAST_MODEL = os.getenv("ROUTER_FAST_MODEL") or None
+ROUTER_FAST_BASE_URL = os.getenv("ROUTER_FAST_BASE_URL") or None
+ROUTER_FAST_API_KEY = os.getenv("ROUTER_FAST_API_KEY") or None
+ROUTER_ESCALATE_BELOW = float(os.getenv("ROUTER_ESCALATE_BELOW", "0.7"))
+
+# Ask for plans as strict JSON-schema structured output (falls back to json_object
+# on endpoints that reject it).
+ROUTER_STRUCTURED_OUTPUT = os.getenv("ROUTER_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+
+def make_openai_client(
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+) -> "OpenAI":
+    """OpenAI client for the configured endpoint, or any OpenAI-compatible one."""
+    # The openai package is slow to import; defer it until a client is actually needed.
+    from openai import OpenAI
 
-def make_openai_client() -> OpenAI:
     return OpenAI(
-        api_key=DEFAULT_API_KEY,
-        base_url=DEFAULT_BASE_URL,
+        api_key=api_key or DEFAULT_API_KEY,
+        base_url=base_url or DEFAULT_BASE_URL,
     )
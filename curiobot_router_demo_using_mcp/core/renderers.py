@@ -0,0 +1,216 @@
+import datetime as dt
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from core.direct_answer import make_direct_answer, make_tool_result
+from core.speculation import predict
+
+# Deterministic QueryResult summaries for structured tool results. Weather and
+# Wikipedia answers are mostly a reformatting of fields, so the API renders them
+# here instead of paying an agent turn; news and open-ended questions still get
+# an LLM-written summary.
+
+RENDERED_TOOLS = ("get_weather", "get_wiki")
+
+# Questions asking for a judgement or explanation need the model, not a template.
+_OPEN_ENDED = re.compile(
+    r"\b(why|should|which|better|best|worse|recommend|explain|difference|versus|vs\.?|plan|pack|wear)\b",
+    re.IGNORECASE,
+)
+
+# WMO weather interpretation codes used by Open-Meteo.
+WEATHER_CODES = {
+    0: "clear sky",
+    1: "mainly clear",
+    2: "partly cloudy",
+    3: "overcast",
+    45: "fog",
+    48: "depositing rime fog",
+    51: "light drizzle",
+    53: "drizzle",
+    55: "dense drizzle",
+    56: "freezing drizzle",
+    57: "dense freezing drizzle",
+    61: "light rain",
+    63: "rain",
+    65: "heavy rain",
+    66: "freezing rain",
+    67: "heavy freezing rain",
+    71: "light snow",
+    73: "snow",
+    75: "heavy snow",
+    77: "snow grains",
+    80: "light rain showers",
+    81: "rain showers",
+    82: "violent rain showers",
+    85: "snow showers",
+    86: "heavy snow showers",
+    95: "thunderstorms",
+    96: "thunderstorms with hail",
+    99: "thunderstorms with heavy hail",
+}
+
+
+def is_simple(question: str) -> bool:
+    """True if `question` most likely wants a weather report or an encyclopedia summary, as is."""
+    prediction = predict(question)
+    return (
+        prediction is not None
+        and prediction["tool"] in RENDERED_TOOLS
+        and not _OPEN_ENDED.search(question)
+    )
+
+
+def day_summary(forecast: Dict[str, Any], target_date: dt.date) -> Dict[str, Any]:
+    """Min/max temperature, peak rain chance and most common weather code for one day."""
+    hourly = forecast.get("hourly") or {}
+    day = str(target_date)
+    idx = [i for i, t in enumerate(hourly.get("time", [])) if t.startswith(day)]
+    if not idx:
+        return {}
+
+    def values(key: str) -> List[Any]:
+        series = hourly.get(key) or []
+        return [series[i] for i in idx if i < len(series) and series[i] is not None]
+
+    temps = values("temperature_2m")
+    rain = values("precipitation_probability")
+    codes = values("weathercode")
+    return {
+        "date": day,
+        "temperature_min": min(temps) if temps else None,
+        "temperature_max": max(temps) if temps else None,
+        "precipitation_probability_max": max(rain) if rain else None,
+        "weathercode": max(set(codes), key=codes.count) if codes else None,
+        "units": forecast.get("hourly_units", {}),
+    }
+
+
+def _place(location: Dict[str, Any], fallback: str) -> str:
+    parts = [location.get("name") or fallback, location.get("admin1"), location.get("country")]
+    return ", ".join(dict.fromkeys(p for p in parts if p))
+
+
+def _num(value: float) -> str:
+    return f"{value:.0f}"
+
+
+def _describe_day(summary: Dict[str, Any]) -> Optional[str]:
+    """'partly cloudy, 14-22°C, up to 40% chance of rain', or None without data."""
+    if not summary or summary.get("temperature_min") is None:
+        return None
+    unit = (summary.get("units") or {}).get("temperature_2m", "°C")
+    parts = []
+    if summary.get("weathercode") is not None:
+        parts.append(WEATHER_CODES.get(summary["weathercode"], f"weather code {summary['weathercode']}"))
+    parts.append(f"{_num(summary['temperature_min'])}-{_num(summary['temperature_max'])}{unit}")
+    if summary.get("precipitation_probability_max") is not None:
+        parts.append(f"up to {_num(summary['precipitation_probability_max'])}% chance of rain")
+    return ", ".join(parts)
+
+
+def _day_label(target_date: str) -> str:
+    try:
+        date = dt.date.fromisoformat(target_date)
+    except (TypeError, ValueError):
+        return "today"
+    if date == dt.date.today() + dt.timedelta(days=1):
+        return f"tomorrow ({date:%a %d %b})"
+    return f"today ({date:%a %d %b})"
+
+
+def render_weather(args: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not result.get("ok"):
+        if result.get("error") == "location_not_found":
+            names = result.get("not_found") or [args.get("location")]
+            return make_direct_answer(
+                summary=f"I couldn't find a place called {', '.join(n for n in names if n)}.",
+                reason="location_not_found",
+                ok=False,
+            )
+        return None
+
+    label = _day_label(result.get("target_date", ""))
+    if "locations" in result:
+        lines = []
+        for entry in result["locations"]:
+            described = _describe_day(entry.get("summary") or {})
+            if described is None:
+                return None
+            lines.append(f"- {_place(entry.get('location') or {}, entry.get('name', ''))}: {described}")
+        if result.get("not_found"):
+            lines.append(f"(No match for: {', '.join(result['not_found'])})")
+        summary = f"Weather {label}:\n" + "\n".join(lines)
+        raw = {
+            "target_date": result.get("target_date"),
+            "locations": [{"name": e.get("name"), "summary": e.get("summary")} for e in result["locations"]],
+            "not_found": result.get("not_found", []),
+        }
+        return make_tool_result("get_weather", args, summary, raw)
+
+    try:
+        target_date = dt.date.fromisoformat(result["target_date"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    day = day_summary(result.get("forecast") or {}, target_date)
+    described = _describe_day(day)
+    if described is None:
+        return None
+    place = _place(result.get("location") or {}, args.get("location", ""))
+    summary = f"Weather in {place} {label}: {described}."
+    raw = {"location": place, "target_date": result["target_date"], "summary": day}
+    return make_tool_result("get_weather", args, summary, raw)
+
+
+def render_wiki(args: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not result.get("ok"):
+        if result.get("error") == "not_found":
+            return make_direct_answer(
+                summary=f"I couldn't find a Wikipedia article about {args.get('topic')}.",
+                reason="wiki_not_found",
+                ok=False,
+            )
+        return None
+    # A disambiguation page lists meanings rather than answering; let the agent handle it.
+    if result.get("type") == "disambiguation" or not result.get("extract"):
+        return None
+
+    url = ((result.get("content_urls") or {}).get("desktop") or {}).get("page")
+    summary = f"{result.get('title')}: {result['extract'].strip()}"
+    if url:
+        summary += f"\n\nSource: {url}"
+    raw = {"title": result.get("title"), "url": url, "source": result.get("source", "wikipedia")}
+    return make_tool_result("get_wiki", args, summary, raw)
+
+
+def is_router_fallback(plan: Dict[str, Any]) -> bool:
+    """
+    True for the direct_answer the router substitutes when it could not parse a
+    plan: its "answer" is the raw model reply or a stock apology, not an answer.
+    """
+    return plan.get("tool") == "direct_answer" and str(plan.get("reason") or "").startswith("fallback")
+
+
+def render_direct_answer(args: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # The router already wrote this answer with the model.
+    if not result.get("ok") or not result.get("answer"):
+        return None
+    return make_tool_result("direct_answer", {}, result["answer"])
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+    "get_weather": render_weather,
+    "get_wiki": render_wiki,
+    "direct_answer": render_direct_answer,
+}
+
+
+def render(plan: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    QueryResult-shaped dict for a `query` tool response ({"plan", "result"}),
+    or None when the tool has no template or the result needs the model.
+    """
+    renderer = RENDERERS.get(plan.get("tool") or "")
+    if renderer is None or not isinstance(result, dict) or is_router_fallback(plan):
+        return None
+    return renderer(plan.get("args") or {}, result)
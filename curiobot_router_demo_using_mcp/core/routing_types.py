@@ -1,4 +1,5 @@
-from typing import Any, Dict, Literal
+import inspect
+from typing import Any, Callable, Dict, List, Literal, Optional, Union, get_args, get_origin, get_type_hints
 from pydantic import BaseModel, Field
 
 ToolName = Literal["get_news", "get_weather", "get_wiki", "direct_answer", "none"]
@@ -18,3 +19,90 @@ class RouterPlan(BaseModel):
         default="",
         description="Short explanation of why this tool was chosen.",
     )
+    confidence: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="Router's confidence (0-1) that tool and args are right.",
+    )
+
+
+# Args of the plan tools that are not MCP tools.
+BUILTIN_TOOL_ARGS: Dict[str, Dict[str, Any]] = {
+    "direct_answer": {
+        "type": "object",
+        "properties": {"answer": {"type": "string"}},
+        "required": ["answer"],
+        "additionalProperties": False,
+    },
+    "none": {"type": "object", "properties": {}, "required": [], "additionalProperties": False},
+}
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+
+def _json_type(annotation: Any) -> Dict[str, Any]:
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        (item,) = get_args(annotation) or (str,)
+        return {"type": "array", "items": _json_type(item)}
+    if origin is Union or type(annotation).__name__ == "UnionType":
+        options = [a for a in get_args(annotation) if a is not type(None)]
+        schema = _json_type(options[0]) if options else {"type": "string"}
+        return {**schema, "type": [schema["type"], "null"]}
+    return {"type": _JSON_TYPES.get(annotation, "string")}
+
+
+def args_schema(fn: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Strict JSON schema for a tool function's keyword args. Structured outputs
+    require every property to be listed as required, so optional parameters
+    are nullable instead (the router drops nulls before dispatch).
+    """
+    hints = get_type_hints(fn)
+    properties: Dict[str, Any] = {}
+    for name, param in inspect.signature(fn).parameters.items():
+        schema = _json_type(hints.get(name, str))
+        if param.default is not inspect.Parameter.empty and "null" not in schema["type"]:
+            schema["type"] = [schema["type"], "null"]
+        properties[name] = schema
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def plan_schema(tool_args: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    `response_format` for strict structured output of a RouterPlan, with the
+    args of each tool in `tool_args` (plus direct_answer/none) as alternatives.
+    """
+    tool_args = {**tool_args, **BUILTIN_TOOL_ARGS}
+    fields = RouterPlan.model_fields
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "router_plan",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "tool": {
+                        "type": "string",
+                        "enum": [t for t in get_args(ToolName) if t in tool_args],
+                        "description": fields["tool"].description,
+                    },
+                    "args": {
+                        "anyOf": list(tool_args.values()),
+                        "description": fields["args"].description,
+                    },
+                    "reason": {"type": "string", "description": fields["reason"].description},
+                    "confidence": {"type": "number", "description": fields["confidence"].description},
+                },
+                "required": ["tool", "args", "reason", "confidence"],
+                "additionalProperties": False,
+            },
+        },
+    }
@@ -0,0 +1,143 @@
+import re
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from utils.stats import latency_summary
+
+# Cheap local guesses of the router's plan, used to start the upstream fetch
+# while the LLM routing call is still in flight. A guess only has to be right
+# often enough to pay for the occasional wasted fetch; the LLM plan always wins.
+
+DEFAULT_NEWS_FRESHNESS_DAYS = 3
+
+_WEATHER = re.compile(
+    r"\b(weather|forecast|temperature|rain(ing|y)?|snow(ing|y)?|umbrella|sunny|hot|cold|humid|wind(y)?)\b",
+    re.IGNORECASE,
+)
+# "in Sydney", "for New York", "in Sydney, Melbourne and Perth"
+_PLACE = r"[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*"
+_PLACES = re.compile(rf"\b(?:in|for|at)\s+({_PLACE}(?:\s*(?:,|and|&)\s*{_PLACE})*)")
+_SHORT_WEATHER = re.compile(
+    r"^\s*(?:weather|forecast)\s+(?:in\s+|for\s+)?([a-z][\w' -]*?)\s*(?:today|tomorrow)?\s*\??\s*$",
+    re.IGNORECASE,
+)
+
+_NEWS = re.compile(
+    r"(?:news|headlines?|updates?)\s+(?:about|on|regarding|for|in)\s+(?:the\s+)?(.+?)\s*[?.!]*$",
+    re.IGNORECASE,
+)
+
+_WIKI = re.compile(
+    r"^\s*(?:who\s+(?:is|was|were)|what\s+(?:is|are|was)|tell\s+me\s+about|"
+    r"(?:give\s+me\s+)?(?:a\s+)?summary\s+of|wikipedia)\s+(?:an?\s+|the\s+)?(.+?)\s*[?.!]*$",
+    re.IGNORECASE,
+)
+_WIKI_NOISE = re.compile(r"^(?:the\s+)?history\s+of\s+(?:the\s+)?|\s+(?:from|on)\s+wikipedia$", re.IGNORECASE)
+_TRAILING_TIME = re.compile(r"\s+(?:today|tomorrow|this\s+week|right\s+now|please)$", re.IGNORECASE)
+
+
+def _clean(text: str) -> str:
+    text = _TRAILING_TIME.sub("", text.strip(" ?.!"))
+    return _TRAILING_TIME.sub("", text).strip()
+
+
+def _when(question: str) -> str:
+    return "tomorrow" if "tomorrow" in question.lower() else "today"
+
+
+def predict(question: str) -> Optional[Dict[str, Any]]:
+    """
+    Guess {"tool", "args", "confidence"} for `question` from keywords and simple
+    patterns, or None when there is no confident guess (the common case for
+    open-ended questions, which the router answers directly).
+    """
+    if _WEATHER.search(question):
+        match = _PLACES.search(question)
+        if match:
+            places = [p.strip() for p in re.split(r"\s*(?:,|\band\b|&)\s*", match.group(1)) if p.strip()]
+            args: Dict[str, Any] = {"when": _when(question)}
+            if len(places) > 1:
+                args["locations"] = places
+            else:
+                args["location"] = places[0]
+            return {"tool": "get_weather", "args": args, "confidence": 0.9}
+        match = _SHORT_WEATHER.match(question)
+        if match and _clean(match.group(1)):
+            args = {"location": _clean(match.group(1)).title(), "when": _when(question)}
+            return {"tool": "get_weather", "args": args, "confidence": 0.6}
+        return None
+
+    match = _NEWS.search(question)
+    if match and _clean(match.group(1)):
+        return {"tool": "get_news", "args": {"query": _clean(match.group(1))}, "confidence": 0.8}
+
+    match = _WIKI.match(question)
+    if match:
+        topic = _WIKI_NOISE.sub("", _clean(match.group(1))).strip()
+        # "What is 17 times 23?" is arithmetic, not an article.
+        if topic and re.search(r"[A-Za-z]{3,}", topic) and not re.search(r"\d", topic):
+            return {"tool": "get_wiki", "args": {"topic": topic}, "confidence": 0.7}
+    return None
+
+
+def _norm(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def _canonical(tool: str, args: Dict[str, Any]) -> Tuple[Any, ...]:
+    """What a tool call actually fetches, so cosmetic differences still match."""
+    if tool == "get_weather":
+        names = args.get("locations") or [args.get("location")]
+        # Whole names: "Paris" and "Paris, Texas" are different fetches. A plan that
+        # merely adds the country costs a re-fetch, not a wrong answer.
+        places = tuple(sorted(_norm(n) for n in names if n))
+        return places, _when(str(args.get("when") or ""))
+    if tool == "get_news":
+        query = args.get("query") or args.get("topic")
+        return _norm(query), int(args.get("freshness_days") or DEFAULT_NEWS_FRESHNESS_DAYS)
+    if tool == "get_wiki":
+        return (_norm(args.get("topic")),)
+    return (_norm(args),)
+
+
+def plans_match(prediction: Dict[str, Any], plan: Dict[str, Any]) -> bool:
+    """True if the speculative call fetches exactly what `plan` asks for."""
+    if prediction.get("tool") != plan.get("tool"):
+        return False
+    tool = plan["tool"]
+    return _canonical(tool, prediction.get("args") or {}) == _canonical(tool, plan.get("args") or {})
+
+
+class SpeculationStats:
+    """
+    Outcomes of speculative fetches:
+      - hit:       prediction matched the plan; its result was used
+      - cancelled: mismatch, fetch still running and cancelled
+      - wasted:    mismatch, fetch had already completed (upstream call spent for nothing)
+      - error:     prediction matched but the fetch failed; the plan was re-run
+      - none:      no confident prediction, nothing started
+    `hidden_ms` is the fetch time that overlapped routing on hits.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.hidden_ms: Deque[float] = deque(maxlen=1000)
+
+    def record(self, outcome: str, hidden_ms: Optional[float] = None) -> None:
+        self.counts[outcome] += 1
+        if hidden_ms is not None:
+            self.hidden_ms.append(hidden_ms)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def summary(self) -> Dict[str, Any]:
+        started = self.total - self.counts["none"]
+        return {
+            **dict(self.counts),
+            "hit_rate": round(self.counts["hit"] / started, 3) if started else None,
+            "wasted_rate": round((self.counts["wasted"] + self.counts["cancelled"]) / started, 3) if started else None,
+            "hidden_ms": latency_summary(self.hidden_ms),
+        }
+
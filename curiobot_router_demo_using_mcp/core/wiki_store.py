@@ -0,0 +1,121 @@
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    url TEXT,
+    abstract TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title, abstract, content='pages', content_rowid='id'
+);
+"""
+
+
+def title_key(title: str) -> str:
+    """Case- and whitespace-insensitive form of a title for exact lookups."""
+    return " ".join(title.lower().split())
+
+
+def fts_query(text: str, op: str = " ") -> str:
+    """
+    Turn free text into an FTS5 query matching every word (quoted, so no syntax
+    errors); pass op=" OR " to match any of them instead.
+    """
+    return op.join(f'"{token}"' for token in _TOKEN.findall(text.lower()))
+
+
+class WikiStore:
+    """
+    Local Wikipedia summary store: page abstracts in SQLite with an FTS5 index.
+
+    Built offline by scripts/build_wiki_index.py from a Wikipedia abstracts dump;
+    `lookup()` answers a get_wiki topic in milliseconds without network access.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Opened read-only: the index is only written by the build script.
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def lookup(self, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Best page for `topic`: an exact title match if there is one, otherwise
+        the top full-text hit, searching titles before abstracts. A page found
+        through its abstract must still have one of the topic's words in its
+        title: common words occur in thousands of abstracts, and a miss lets
+        get_wiki fall back to the Wikipedia API instead of answering with an
+        unrelated page.
+        """
+        row = self.conn.execute(
+            "SELECT title, url, abstract FROM pages WHERE title_key = ? LIMIT 1",
+            (title_key(topic),),
+        ).fetchone()
+        query = fts_query(topic)
+        if row is None and query:
+            # Pages whose title has every word first; they are far fewer than
+            # abstract matches for common words, and usually what was meant.
+            row = self._search(f"title : ({query})")
+        if row is None and query:
+            row = self._search(f"({query}) AND title : ({fts_query(topic, ' OR ')})")
+        return dict(row) if row else None
+
+    def _search(self, match: str) -> Optional[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT p.title, p.url, p.abstract FROM pages_fts f "
+            "JOIN pages p ON p.id = f.rowid "
+            "WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts, 10.0, 1.0) LIMIT 1",
+            (match,),
+        ).fetchone()
+
+    # --- Building -----------------------------------------------------------
+
+    @staticmethod
+    def build(path: str, pages: Iterable[Tuple[str, str, str]], batch_size: int = 5000) -> int:
+        """
+        Write (title, url, abstract) rows into a new index at `path` and build
+        the full-text index once at the end (much faster than per-row updates).
+        Returns the number of pages stored.
+        """
+        conn = sqlite3.connect(path)
+        try:
+            # Bulk load: the file is rebuilt from scratch if the import fails.
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.executescript(SCHEMA)
+
+            count = 0
+            for batch in _batches(pages, batch_size):
+                conn.executemany(
+                    "INSERT INTO pages (title, title_key, url, abstract) VALUES (?, ?, ?, ?)",
+                    [(title, title_key(title), url, abstract) for title, url, abstract in batch],
+                )
+                count += len(batch)
+            conn.execute("CREATE INDEX IF NOT EXISTS pages_title_key ON pages (title_key)")
+            conn.execute("INSERT INTO pages_fts (pages_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+            conn.commit()
+            return count
+        finally:
+            conn.close()
+
+
+def _batches(rows: Iterable[Any], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -1,44 +1,159 @@
 import os
-import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
 import httpx
 import gradio as gr
 
+from utils import json_codec
+
 API_BASE = os.getenv("API_BASE", "http://localhost:7421")
 
+# Turns shown in full in the history; older ones are collapsed to one line, and
+# only the last HISTORY_MAX_TURNS are kept at all, so the chat payload sent to
+# the browser on every answer stays bounded however long the session runs.
+HISTORY_WINDOW = int(os.getenv("CURIOBOT_UI_HISTORY_WINDOW", "4"))
+HISTORY_MAX_TURNS = int(os.getenv("CURIOBOT_UI_HISTORY_MAX_TURNS", "30"))
+COLLAPSED_CHARS = 160
+RAW_JSON_MAX_CHARS = 20000
+
+# The API may queue a question for up to CURIOBOT_MAX_QUEUE_WAIT_S before answering
+# 429, then needs service time on top; the client must wait longer than both, or
+# it times out on requests the API is still going to answer.
+MAX_QUEUE_WAIT_S = float(os.getenv("CURIOBOT_MAX_QUEUE_WAIT_S", "60"))
+SERVICE_TIME_S = float(os.getenv("CURIOBOT_UI_SERVICE_TIME_S", "60"))
+QUERY_TIMEOUT_S = MAX_QUEUE_WAIT_S + SERVICE_TIME_S
+
+_client: httpx.AsyncClient | None = None
+
+
+def api_client() -> httpx.AsyncClient:
+    """One pooled client to the API for all sessions (keep-alive instead of a connect per question)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=API_BASE,
+            timeout=httpx.Timeout(QUERY_TIMEOUT_S, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
 
 async def api_health() -> dict:
-    url = f"{API_BASE}/health"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(url)
-        r.raise_for_status()
-        return r.json()
+    r = await api_client().get("/health", timeout=10.0)
+    r.raise_for_status()
+    return json_codec.loads(r.content)
 
 
 async def api_query(question: str) -> dict:
-    url = f"{API_BASE}/query"
     payload = {"question": (question or "").strip()}
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.post(url, json=payload)
-        r.raise_for_status()
-        return r.json()
+    # UI traffic goes in the API's interactive lane, ahead of batch/replay clients.
+    headers = {"X-CurioBot-Priority": "interactive"}
+    r = await api_client().post("/query", json=payload, headers=headers)
+    r.raise_for_status()
+    return json_codec.loads(r.content)
+
+
+def busy_message(response: httpx.Response) -> str:
+    """The API's own 429 summary (admission control), plus its Retry-After hint."""
+    try:
+        summary = json_codec.loads(response.content).get("summary")
+    except Exception:
+        summary = None
+    summary = summary or "CurioBot is busy right now."
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        return f"⏳ {summary} (retry in {retry_after} s)"
+    return f"⏳ {summary}"
 
 
 async def check_health():
     try:
         data = await api_health()
-        return f"✅ API healthy: {json.dumps(data)}"
+        return f"✅ API healthy: {json_codec.dumps(data)}"
     except Exception as e:
         return f"❌ API not reachable: {e}"
 
 
-async def ask(question, history):
+@dataclass
+class Turn:
+    question: str
+    tool: str
+    summary: str
+    answer_md: str
+    raw_tool_output: Dict[str, Any]
+
+
+@dataclass
+class ChatSession:
+    """Per-browser-session history, kept on the Gradio server (gr.State) rather than round-tripped."""
+
+    turns: List[Turn] = field(default_factory=list)
+    dropped: int = 0
+
+    def add(self, turn: Turn) -> None:
+        self.turns.append(turn)
+        if len(self.turns) > HISTORY_MAX_TURNS:
+            overflow = len(self.turns) - HISTORY_MAX_TURNS
+            del self.turns[:overflow]
+            self.dropped += overflow
+
+    def number(self, index: int) -> int:
+        """1-based turn number as shown to the user, counting dropped turns."""
+        return self.dropped + index + 1
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Chatbot messages: collapsed older turns, then the last HISTORY_WINDOW in full."""
+        messages: List[Dict[str, str]] = []
+        if self.dropped:
+            messages.append({"role": "assistant", "content": f"_{self.dropped} earlier turns not shown._"})
+        first_full = len(self.turns) - HISTORY_WINDOW
+        for i, turn in enumerate(self.turns):
+            messages.append({"role": "user", "content": turn.question})
+            if i >= first_full:
+                content = turn.answer_md
+            else:
+                summary = " ".join(turn.summary.split())
+                if len(summary) > COLLAPSED_CHARS:
+                    summary = summary[:COLLAPSED_CHARS].rstrip() + "…"
+                content = f"`{turn.tool}` · {summary or '(no summary)'}"
+            messages.append({"role": "assistant", "content": content})
+        return messages
+
+    def raw_choices(self) -> List[str]:
+        return [f"#{self.number(i)} {turn.question[:60]}" for i, turn in enumerate(self.turns)]
+
+    def raw_json(self, choice: Optional[str]) -> Any:
+        """Raw tool output of the chosen turn (latest by default), rendered only when asked for."""
+        if not self.turns:
+            return None
+        index = len(self.turns) - 1
+        if choice:
+            try:
+                index = int(choice.split()[0].lstrip("#")) - self.dropped - 1
+            except ValueError:
+                pass
+        if not 0 <= index < len(self.turns):
+            return None
+        raw = self.turns[index].raw_tool_output
+        text = json_codec.dumps(raw)
+        if len(text) > RAW_JSON_MAX_CHARS:
+            return {"truncated": True, "preview": text[:RAW_JSON_MAX_CHARS]}
+        return raw
+
+
+def _raw_selector(session: ChatSession) -> Any:
+    choices = session.raw_choices()
+    return gr.update(choices=choices, value=choices[-1] if choices else None)
+
+
+async def ask(question, session: Optional[ChatSession]):
     question = (question or "").strip()
-    # history will be a list of {"role": ..., "content": ...} dicts (messages format)
-    history = history or []
+    session = session or ChatSession()
 
     if not question:
         gr.Warning("Please enter a question.")
-        return gr.update(), gr.update(), history
+        return gr.update(), gr.update(), gr.update(), session, gr.update()
 
     try:
         data = await api_query(question)
@@ -49,7 +164,7 @@ async def ask(question, history):
         plan_obj = {"tool": tool, "args": args}
         plan_md = (
             "### 🔎 Router Plan\n```json\n"
-            + json.dumps(plan_obj, indent=2)[:4000]
+            + json_codec.dumps(plan_obj, indent=True)[:4000]
             + "\n```"
         )
 
@@ -68,40 +183,47 @@ async def ask(question, history):
         if articles_md:
             extended_summary += "\n\n---\n\n" + "\n\n---\n\n".join(articles_md)
 
-        result_md_parts = ["### 📦 Result", extended_summary]
-        if isinstance(raw_tool_output, dict) and raw_tool_output:
-            result_md_parts.append(
-                "\n<details><summary>Raw JSON</summary>\n\n```json\n"
-                + json.dumps(raw_tool_output, indent=2)[:4000]
-                + "\n```\n</details>"
-            )
+        # Raw JSON is not embedded here; the "Raw JSON" panel renders it on demand.
+        result_md = "\n".join(["### 📦 Result", extended_summary])
 
-        result_md = "\n".join(result_md_parts)
+        session.add(Turn(
+            question=question,
+            tool=tool,
+            summary=summary,
+            answer_md=f"**Plan**\n\n{plan_md}\n\n**Result**\n\n{result_md}",
+            raw_tool_output=raw_tool_output if isinstance(raw_tool_output, dict) else {},
+        ))
 
-        # 👉 Chatbot expects messages format: list of {"role", "content"} dicts
-        history.append({"role": "user", "content": question})
-        history.append(
-            {
-                "role": "assistant",
-                "content": f"**Plan**\n\n{plan_md}\n\n**Result**\n\n{result_md}",
-            }
-        )
-
-        return plan_md, result_md, history
+        return plan_md, result_md, session.messages(), session, _raw_selector(session)
 
     except httpx.HTTPStatusError as e:
+        if e.response.status_code == 429:
+            busy_md = busy_message(e.response)
+            gr.Warning(busy_md)
+            return busy_md, busy_md, gr.update(), session, gr.update()
         err_md = f"❌ Error {e.response.status_code}\n```\n{e.response.text}\n```"
         gr.Error(f"Server returned {e.response.status_code}")
-        return err_md, err_md, history
+        return err_md, err_md, gr.update(), session, gr.update()
+    except httpx.TimeoutException:
+        err_md = f"⌛ No answer from the API within {QUERY_TIMEOUT_S:.0f} seconds."
+        gr.Warning(err_md)
+        return err_md, err_md, gr.update(), session, gr.update()
     except Exception as e:
         err_md = f"❌ Request failed: {e}"
         gr.Error(str(e))
-        return err_md, err_md, history
+        return err_md, err_md, gr.update(), session, gr.update()
+
+
+def show_raw(choice: Optional[str], session: Optional[ChatSession], raw_open: bool):
+    # Nothing is serialised or sent while the panel is closed.
+    if not raw_open or session is None:
+        return gr.update()
+    return session.raw_json(choice)
 
 
 def clear_all():
-    # history reset to empty messages list
-    return "", [], "", ""
+    # Drops the server-side session along with the visible history
+    return "", [], "", "", None, gr.update(choices=[], value=None), None
 
 
 theme = gr.themes.Soft(primary_hue="green", neutral_hue="gray")
@@ -213,13 +335,21 @@ with gr.Blocks(title="CurioBot – Weather/News/Wiki") as demo:
             result_panel = gr.Markdown(label="Result", elem_classes=["result", "card"])
 
     with gr.Row():
-        # No 'type' kwarg here – we use the default messages format
+        # No 'type' kwarg here – we use the default messages format.
+        # Output only: the history lives in `session`, not in the browser's request.
         chat_hist = gr.Chatbot(
             label="History",
             elem_classes=["card"],
             height=320,
         )
 
+    session = gr.State(None)
+    raw_open = gr.State(False)
+
+    with gr.Accordion("Raw JSON", open=False) as raw_panel:
+        raw_turn = gr.Dropdown(label="Turn", choices=[], interactive=True)
+        raw_json = gr.JSON(label="raw_tool_output")
+
     gr.HTML(
         """
         <div class="footer" style="margin-top:10px;text-align:center;">
@@ -231,18 +361,24 @@ with gr.Blocks(title="CurioBot – Weather/News/Wiki") as demo:
 
     question.submit(
         fn=ask,
-        inputs=[question, chat_hist],
-        outputs=[plan_panel, result_panel, chat_hist],
+        inputs=[question, session],
+        outputs=[plan_panel, result_panel, chat_hist, session, raw_turn],
     )
     ask_btn.click(
         fn=ask,
-        inputs=[question, chat_hist],
-        outputs=[plan_panel, result_panel, chat_hist],
+        inputs=[question, session],
+        outputs=[plan_panel, result_panel, chat_hist, session, raw_turn],
+    )
+    # Raw JSON is only serialised and sent while the panel is open.
+    raw_panel.expand(fn=lambda: True, outputs=[raw_open]).then(
+        fn=show_raw, inputs=[raw_turn, session, raw_open], outputs=[raw_json]
     )
+    raw_panel.collapse(fn=lambda: False, outputs=[raw_open])
+    raw_turn.change(fn=show_raw, inputs=[raw_turn, session, raw_open], outputs=[raw_json])
     health_btn.click(fn=check_health, outputs=[result_panel])
     clear_btn.click(
         fn=clear_all,
-        outputs=[question, chat_hist, plan_panel, result_panel],
+        outputs=[question, chat_hist, plan_panel, result_panel, session, raw_turn, raw_json],
     )
 
 if __name__ == "__main__":
@@ -18,6 +18,9 @@
 #       OPENAI_API_BASE  # custom OpenAI base URL
 #       OPENAI_MODEL     # override default model
 #       API_BASE         # for UI (defaults to http://localhost:7421)
+#       RELOAD=1         # run uvicorn with --reload (dev only; restarts the MCP child on every edit)
+#       CURIOBOT_WARMUP=true  # pre-list MCP tools, open upstream connections and
+#                             # issue a tiny routing call before /health reports ready
 
 set -euo pipefail
 
@@ -30,9 +33,14 @@ export PYTHONPATH="$ROOT_DIR:${PYTHONPATH:-}"
 API_HOST="127.0.0.1"
 API_PORT="7421"
 
+UVICORN_ARGS=(api.main:app --host "${API_HOST}" --port "${API_PORT}")
+if [[ "${RELOAD:-0}" == "1" ]]; then
+  UVICORN_ARGS+=(--reload)
+fi
+
 start_api() {
   echo "Starting FastAPI (CurioBot API) on ${API_HOST}:${API_PORT}..."
-  uvicorn api.main:app --host "${API_HOST}" --port "${API_PORT}" --reload
+  uvicorn "${UVICORN_ARGS[@]}"
 }
 
 start_ui() {
@@ -44,7 +52,7 @@ start_ui() {
 
 start_all() {
   echo "Starting API in background..."
-  uvicorn api.main:app --host "${API_HOST}" --port "${API_PORT}" --reload &
+  uvicorn "${UVICORN_ARGS[@]}" &
   API_PID=$!
   echo "API PID: ${API_PID}"
 
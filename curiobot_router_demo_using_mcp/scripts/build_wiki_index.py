@@ -0,0 +1,104 @@
+"""Build the local Wikipedia summary index used by get_wiki (WIKI_INDEX_PATH).
+
+Streams a Wikipedia abstracts dump (enwiki-latest-abstract.xml, optionally
+.gz/.bz2 compressed, from https://dumps.wikimedia.org/enwiki/latest/) into a
+SQLite database with an FTS5 full-text index. The dump is parsed element by
+element, so memory use stays flat regardless of dump size, and nothing here
+needs network access: copy the dump into an air-gapped environment and build
+the index there.
+
+Usage:
+  python -m scripts.build_wiki_index enwiki-latest-abstract.xml.gz --out data/wiki_index.sqlite
+  python -m scripts.build_wiki_index enwiki-latest-abstract.xml --limit 100000
+"""
+import argparse
+import bz2
+import gzip
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import IO, Iterator, Optional, Tuple
+
+from core.wiki_store import WikiStore
+
+DEFAULT_OUT = os.path.join("data", "wiki_index.sqlite")
+TITLE_PREFIX = "Wikipedia: "
+
+
+def open_dump(path: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_abstracts(path: str, limit: Optional[int] = None) -> Iterator[Tuple[str, str, str]]:
+    """
+    Stream (title, url, abstract) from an abstracts dump:
+
+        <feed><doc><title>Wikipedia: X</title><url>...</url><abstract>...</abstract>...</doc>...
+
+    Docs without a usable abstract (empty, or infobox/template residue) are skipped.
+    """
+    count = 0
+    with open_dump(path) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end" or elem.tag != "doc":
+                continue
+            title = (elem.findtext("title") or "").removeprefix(TITLE_PREFIX).strip()
+            url = (elem.findtext("url") or "").strip()
+            abstract = (elem.findtext("abstract") or "").strip()
+            # Drop parsed docs so memory does not grow with the dump.
+            root.clear()
+            if not title or not abstract or abstract.startswith(("|", "{")):
+                continue
+            yield title, url, abstract
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def _progress(pages: Iterator[Tuple[str, str, str]], every: int = 100_000) -> Iterator[Tuple[str, str, str]]:
+    started = time.perf_counter()
+    for i, page in enumerate(pages, 1):
+        if i % every == 0:
+            print(f"  {i:,} pages ({i / (time.perf_counter() - started):,.0f}/s)")
+        yield page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the local Wikipedia FTS index from an abstracts dump.")
+    parser.add_argument("dump", help="abstracts dump (.xml, .xml.gz or .xml.bz2)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"index file to write (default {DEFAULT_OUT})")
+    parser.add_argument("--limit", type=int, help="import only the first N pages")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    out_dir = os.path.dirname(os.path.abspath(args.out))
+    os.makedirs(out_dir, exist_ok=True)
+    # Build next to the target and swap in at the end, so a running server
+    # never sees a half-built index.
+    tmp_path = args.out + ".building"
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+
+    started = time.perf_counter()
+    print(f"Importing {args.dump} -> {args.out}")
+    try:
+        count = WikiStore.build(tmp_path, _progress(iter_abstracts(args.dump, args.limit)), args.batch_size)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, args.out)
+
+    size_mb = os.path.getsize(args.out) / 1e6
+    print(f"Indexed {count:,} pages in {time.perf_counter() - started:.1f}s ({size_mb:.1f} MB)")
+    print(f"Set WIKI_INDEX_PATH={args.out} to serve get_wiki from it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""JSON codec micro-benchmark across the layers a question passes through.
+
+Per layer, on realistic synthetic payloads (multi-day Open-Meteo forecasts,
+NewsAPI article lists, router plans, QueryResult responses), measures the
+encode/decode cost of every available codec:
+  - upstream_decode  tool decodes the Open-Meteo / NewsAPI body   (MCP server)
+  - mcp_framing      tool result encoded for the stdio transport (MCP server)
+  - router_plan      model output parsed into a plan              (LLMRouter)
+  - api_response     QueryResult rendered by FastAPI              (API)
+  - ui_pretty        indented raw JSON shown in the UI            (Gradio)
+
+The MCP SDK frames tool results with pydantic_core; it is listed as its own
+codec where installed so the framing layer can be compared with the others.
+
+Usage:
+  python -m scripts.codec_benchmark
+  python -m scripts.codec_benchmark --articles 100 --days 7 --json /tmp/codec.json
+"""
+import argparse
+import datetime as dt
+import json
+import pathlib
+import random
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from utils.json_codec import available_codecs
+
+try:
+    import pydantic_core
+except ImportError:  # only needed to compare against MCP's own framing
+    pydantic_core = None
+
+
+# --- Synthetic payloads ----------------------------------------------------
+
+def forecast_payload(days: int, rng: random.Random) -> Dict[str, Any]:
+    """Open-Meteo /v1/forecast response with hourly temperature/precipitation/weathercode."""
+    start = dt.datetime(2025, 11, 16)
+    hours = days * 24
+    return {
+        "latitude": -33.87, "longitude": 151.21, "generationtime_ms": 0.07,
+        "utc_offset_seconds": 39600, "timezone": "Australia/Sydney",
+        "timezone_abbreviation": "GMT+11", "elevation": 39.0,
+        "hourly_units": {"time": "iso8601", "temperature_2m": "°C",
+                         "precipitation_probability": "%", "weathercode": "wmo code"},
+        "hourly": {
+            "time": [(start + dt.timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(hours)],
+            "temperature_2m": [round(rng.uniform(12, 31), 1) for _ in range(hours)],
+            "precipitation_probability": [rng.randint(0, 100) for _ in range(hours)],
+            "weathercode": [rng.choice([0, 1, 2, 3, 45, 61, 63, 80, 95]) for _ in range(hours)],
+        },
+    }
+
+
+def news_payload(articles: int, rng: random.Random) -> Dict[str, Any]:
+    """NewsAPI /v2/everything response."""
+    words = ("bank rates market inflation quarterly profit outlook customers digital "
+             "strategy regulator housing lending growth sentiment survey report").split()
+
+    def text(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+    return {
+        "status": "ok",
+        "totalResults": articles * 7,
+        "articles": [
+            {
+                "source": {"id": None, "name": rng.choice(["ABC News", "Reuters", "The Guardian"])},
+                "author": "Staff Reporter",
+                "title": text(10),
+                "description": text(35),
+                "url": f"https://news.example.com/{i}",
+                "urlToImage": f"https://news.example.com/{i}.jpg",
+                "publishedAt": f"2025-11-{10 + i % 6:02d}T0{i % 10}:15:00Z",
+                "content": text(60) + " [+2841 chars]",
+            }
+            for i in range(articles)
+        ],
+    }
+
+
+def build_payloads(days: int, articles: int, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    forecast = forecast_payload(days, rng)
+    news = news_payload(articles, rng)
+    plan = {"tool": "get_news", "args": {"query": "Westpac"}, "reason": "User asks for latest news."}
+    query_result = {
+        "tool": "get_news",
+        "args": plan["args"],
+        "summary": " ".join(a["description"] for a in news["articles"][:5]),
+        "raw_tool_output": {"articles": [
+            {"title": a["title"], "source": a["source"]["name"], "url": a["url"]}
+            for a in news["articles"]
+        ]},
+    }
+    return {
+        "forecast": forecast,
+        "news": news,
+        "plan": plan,
+        "query_result": query_result,
+        "tool_result": {"plan": plan, "result": {"ok": True, **news}},
+    }
+
+
+# --- Codecs under test -----------------------------------------------------
+
+def codecs_under_test() -> Dict[str, Tuple[Callable[..., bytes], Callable[[bytes], Any]]]:
+    """name -> (dumps_bytes(obj, indent=False), loads(bytes))."""
+    codecs = {name: (c.dumps_bytes, c.loads) for name, c in available_codecs().items()}
+    if pydantic_core is not None:
+        codecs["pydantic_core"] = (
+            lambda obj, indent=False: pydantic_core.to_json(obj, indent=2 if indent else None),
+            pydantic_core.from_json,
+        )
+    return codecs
+
+
+def layer_cases(payloads: Dict[str, Any]) -> List[Tuple[str, str, str, Any]]:
+    """(layer, payload name, operation, payload) for every layer measured."""
+    stdlib = lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return [
+        ("upstream_decode", "forecast", "loads", stdlib(payloads["forecast"])),
+        ("upstream_decode", "news", "loads", stdlib(payloads["news"])),
+        ("mcp_framing", "tool_result", "dumps", payloads["tool_result"]),
+        ("router_plan", "plan", "loads", stdlib(payloads["plan"])),
+        ("api_response", "query_result", "dumps", payloads["query_result"]),
+        ("ui_pretty", "news", "dumps_indent", payloads["news"]),
+    ]
+
+
+def measure(fn: Callable[[], Any], min_time_s: float) -> float:
+    """Best-of-5 time per call in microseconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time_s / 0.2))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def run(days: int, articles: int, min_time_s: float) -> List[Dict[str, Any]]:
+    payloads = build_payloads(days, articles)
+    codecs = codecs_under_test()
+    rows = []
+    for layer, name, op, payload in layer_cases(payloads):
+        size = len(payload) if isinstance(payload, bytes) else len(codecs["json"][0](payload))
+        row = {"layer": layer, "payload": name, "op": op, "bytes": size, "us": {}}
+        for codec_name, (dumps_bytes, loads) in codecs.items():
+            if op == "loads":
+                fn = lambda: loads(payload)
+            elif op == "dumps_indent":
+                fn = lambda: dumps_bytes(payload, indent=True)
+            else:
+                fn = lambda: dumps_bytes(payload)
+            row["us"][codec_name] = round(measure(fn, min_time_s), 1)
+        rows.append(row)
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    names = list(rows[0]["us"])
+    header = f"{'layer':<16} {'payload':<13} {'op':<13} {'KiB':>7} " + " ".join(
+        f"{n + ' µs':>16}" if n == "json" else f"{n + ' µs':>17}" for n in names
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        base = r["us"]["json"]
+        cells = " ".join(
+            f"{us:>9} ({base / us:>4.1f}x)" if name != "json" else f"{us:>16}"
+            for name, us in r["us"].items()
+        )
+        print(f"{r['layer']:<16} {r['payload']:<13} {r['op']:<13} {r['bytes'] / 1024:>7.1f} {cells}")
+    print("\n(n.nx) = speed-up over the stdlib json codec")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-layer JSON codec micro-benchmark.")
+    parser.add_argument("--days", type=int, default=7, help="forecast length in days (hourly data)")
+    parser.add_argument("--articles", type=int, default=50, help="articles in the news payload")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per measurement round")
+    parser.add_argument("--json", type=pathlib.Path, help="also write results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.days, args.articles, args.min_time)
+    print_table(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
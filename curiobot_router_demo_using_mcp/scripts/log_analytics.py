@@ -0,0 +1,412 @@
+"""Latency and tool-mix report from the CurioBot logs.
+
+Streams logs/curiobot.log (API) and logs/curiobot_agent.log (MCP child), each
+with its rotated backups (.5 ... .1, oldest first), merged in time order. Only
+the current line of each file is held in memory, and percentiles are computed
+over bounded samples, so multi-GB logs are fine. Reports:
+  - per-hour throughput (requests, rejected, failed)
+  - end-to-end latency percentiles, overall and per tool
+  - per-upstream latency percentiles and non-2xx rates (OpenAI, NewsAPI, ...)
+  - tool distribution and error rates
+
+The logs carry no request ids, so requests are joined by timestamp. A request
+runs from its "Question=" line to the next "Agent tool=" (or "Rejected") line,
+and every line of either log in between is attributed to it. A request that
+never completes (crash, restart) counts as failed. httpx logs a call only when
+it completes, so an upstream call's latency is estimated as the time since the
+previous logged event of either process. This is exact while requests do not
+overlap (the default CURIOBOT_MAX_IN_FLIGHT=1). With --in-flight N, up to N
+open requests are matched first-in first-out, which is approximate.
+
+Usage:
+  python -m scripts.log_analytics
+  python -m scripts.log_analytics --since 2025-11-20 --csv /tmp/curiobot_logs
+  python -m scripts.log_analytics --parquet /tmp/curiobot_logs   # needs pyarrow
+  python -m scripts.log_analytics --json /tmp/report.json
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import re
+from collections import Counter, defaultdict, deque
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, get_args, get_type_hints
+from urllib.parse import urlsplit
+
+from utils.log_stream import LogRecord, iter_merged_records, question_of
+from utils.stats import latency_summary
+
+DEFAULT_API_LOG = os.path.join("logs", "curiobot.log")
+DEFAULT_MCP_LOG = os.path.join("logs", "curiobot_agent.log")
+
+# Background telemetry, not part of answering a request.
+IGNORED_UPSTREAMS = ("api.openai.com/v1/traces",)
+
+# Values kept per latency series; beyond this a uniform random sample is kept.
+SAMPLE_SIZE = 100_000
+
+_HTTPX = re.compile(r'^HTTP Request: (?P<method>[A-Z]+) (?P<url>\S+) "HTTP/[\d.]+ (?P<status>\d{3})')
+_RUNNING = re.compile(r"^Running Agent(?: lane=(?P<lane>\w+) wait_ms=(?P<wait>[\d.]+))?")
+_AGENT_TOOL = re.compile(r"^Agent tool=(?P<tool>\S+)")
+_REJECTED = re.compile(r"^Rejected lane=(?P<lane>\w+) reason=(?P<reason>\w+)")
+
+
+@dataclass
+class Request:
+    start: datetime
+    question: str
+    end: Optional[datetime] = None
+    status: str = "open"  # ok | rejected | failed
+    tool: str = ""
+    path: str = "agent"  # agent | template | cache
+    lane: str = ""
+    wait_ms: Optional[float] = None
+    latency_ms: Optional[float] = None
+    llm_calls: int = 0
+    upstream_calls: int = 0
+    errors_logged: int = 0
+
+
+@dataclass
+class UpstreamCall:
+    ts: datetime
+    source: str
+    upstream: str
+    method: str
+    status: int
+    latency_ms: float
+
+
+class Sample:
+    """Reservoir sample of a latency series: exact up to SAMPLE_SIZE values, bounded after."""
+
+    def __init__(self, size: int = SAMPLE_SIZE) -> None:
+        self.size = size
+        self.seen = 0
+        self.values: List[float] = []
+
+    def add(self, value: float) -> None:
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            i = random.randrange(self.seen)
+            if i < self.size:
+                self.values[i] = value
+
+    def summary(self) -> Dict[str, float]:
+        return {**latency_summary(self.values), "count": self.seen}
+
+
+def upstream_name(url: str) -> str:
+    """Host plus the first path segments, e.g. api.openai.com/v1/chat/completions."""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s][:3]
+    return "/".join([parts.netloc, *segments])
+
+
+def _ms(start: datetime, end: datetime) -> float:
+    return max(0.0, (end - start).total_seconds() * 1000)
+
+
+class LogAnalytics:
+    """Folds the merged record stream into requests, upstream calls and aggregates."""
+
+    def __init__(self, in_flight: int = 1) -> None:
+        self.in_flight = in_flight
+        self.open: deque = deque()
+        self.previous_ts: Optional[datetime] = None
+        self.requests = 0
+        self.status = Counter()
+        self.tools = Counter()
+        self.paths = Counter()
+        self.hourly: Dict[str, Counter] = defaultdict(Counter)
+        self.latency: Dict[str, Sample] = defaultdict(Sample)
+        self.upstream_latency: Dict[str, Sample] = defaultdict(Sample)
+        self.upstream_status: Dict[str, Counter] = defaultdict(Counter)
+        self.errors_by_logger = Counter()
+        self.first_ts: Optional[datetime] = None
+        self.last_ts: Optional[datetime] = None
+
+    def feed(self, source: str, record: LogRecord) -> Iterator[Any]:
+        """Consume one record; yields each Request / UpstreamCall as it completes."""
+        self.first_ts = self.first_ts or record.ts
+        self.last_ts = record.ts
+        message = record.message
+
+        if record.level in ("ERROR", "CRITICAL"):
+            self.errors_by_logger[record.logger] += 1
+            if self.open:
+                self.open[0].errors_logged += 1
+
+        match = _HTTPX.match(message)
+        if match:
+            call = self._upstream(source, record, match)
+            if call is not None:
+                yield call
+            return
+
+        self.previous_ts = record.ts
+        if source != "api":
+            return
+
+        question = question_of(record)
+        if question is not None:
+            if len(self.open) >= self.in_flight:
+                # More arrivals than can be in flight: the oldest never completed.
+                yield from self._close("failed", record.ts)
+            self.open.append(Request(start=record.ts, question=question))
+            return
+        if message.startswith("[shutdown]") or message.startswith("[startup]"):
+            yield from self.finish(record.ts)
+            return
+        if not self.open:
+            return
+
+        request = self.open[0]
+        if (match := _RUNNING.match(message)) is not None:
+            request.lane = match["lane"] or ""
+            request.wait_ms = float(match["wait"]) if match["wait"] else None
+        elif message.startswith("Answered from template"):
+            request.path = "template"
+        elif message.startswith("Answered from cache"):
+            request.path = "cache"
+        elif (match := _AGENT_TOOL.match(message)) is not None:
+            request.tool = match["tool"]
+            yield from self._close("ok", record.ts)
+        elif (match := _REJECTED.match(message)) is not None:
+            request.lane = match["lane"]
+            request.tool = "-"
+            yield from self._close("rejected", record.ts)
+
+    def _upstream(self, source: str, record: LogRecord, match: "re.Match[str]") -> Optional[UpstreamCall]:
+        name = upstream_name(match["url"])
+        if name.startswith(IGNORED_UPSTREAMS):
+            return None
+        latency_ms = _ms(self.previous_ts, record.ts) if self.previous_ts else 0.0
+        self.previous_ts = record.ts
+        status = int(match["status"])
+        self.upstream_latency[name].add(latency_ms)
+        self.upstream_status[name]["2xx" if 200 <= status < 300 else "other"] += 1
+        if self.open:
+            self.open[0].upstream_calls += 1
+            if "openai.com" in name:
+                self.open[0].llm_calls += 1
+        return UpstreamCall(record.ts, source, name, match["method"], status, round(latency_ms, 1))
+
+    def _close(self, status: str, ts: datetime) -> Iterator[Request]:
+        """Complete the oldest open request."""
+        if not self.open:
+            return
+        request = self.open.popleft()
+        request.status = status
+        request.end = ts
+        request.latency_ms = round(_ms(request.start, ts), 1)
+
+        self.requests += 1
+        self.status[status] += 1
+        self.hourly[request.start.strftime("%Y-%m-%d %H:00")][status] += 1
+        if status == "ok":
+            self.tools[request.tool] += 1
+            self.paths[request.path] += 1
+            self.latency["all"].add(request.latency_ms)
+            self.latency[request.tool].add(request.latency_ms)
+        yield request
+
+    def finish(self, ts: Optional[datetime] = None) -> Iterator[Request]:
+        """Requests still open at a restart or at the end of the logs count as failed."""
+        while self.open:
+            yield from self._close("failed", ts or self.last_ts)
+
+    def report(self) -> Dict[str, Any]:
+        total = self.requests
+        return {
+            "window": [str(self.first_ts), str(self.last_ts)],
+            "requests": total,
+            "status": dict(self.status),
+            "error_rate": round((self.status["failed"] + self.status["rejected"]) / total, 3) if total else 0.0,
+            "hourly": {hour: dict(counts) for hour, counts in sorted(self.hourly.items())},
+            "latency_ms": {name: sample.summary() for name, sample in sorted(self.latency.items())},
+            "tools": dict(self.tools.most_common()),
+            "paths": dict(self.paths),
+            "upstreams": {
+                name: {
+                    **sample.summary(),
+                    "non_2xx_rate": round(self.upstream_status[name]["other"] / sample.seen, 3),
+                }
+                for name, sample in sorted(self.upstream_latency.items())
+            },
+            "errors_logged": dict(self.errors_by_logger.most_common()),
+        }
+
+
+# --- Exports ---------------------------------------------------------------
+
+class RowWriter:
+    """Streams Request / UpstreamCall rows into requests.* and upstream_calls.* files."""
+
+    def __init__(self, directory: str, fmt: str, batch_size: int = 10_000) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory, self.fmt, self.batch_size = directory, fmt, batch_size
+        self._writers: Dict[type, Any] = {}
+        self._batches: Dict[type, List[Dict[str, Any]]] = defaultdict(list)
+        self._files: List[Any] = []
+
+    def write(self, row: Any) -> None:
+        kind = type(row)
+        values = asdict(row)
+        if self.fmt == "csv":
+            if kind not in self._writers:
+                f = open(self._path(kind), "w", newline="", encoding="utf-8")
+                self._files.append(f)
+                self._writers[kind] = csv.DictWriter(f, fieldnames=[x.name for x in fields(kind)])
+                self._writers[kind].writeheader()
+            self._writers[kind].writerow(values)
+            return
+        self._batches[kind].append(values)
+        if len(self._batches[kind]) >= self.batch_size:
+            self._flush_parquet(kind)
+
+    def _path(self, kind: type) -> str:
+        name = "requests" if kind is Request else "upstream_calls"
+        return os.path.join(self.directory, f"{name}.{self.fmt}")
+
+    def _flush_parquet(self, kind: type) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        batch = self._batches.pop(kind, [])
+        if not batch:
+            return
+        if kind not in self._writers:
+            self._writers[kind] = pq.ParquetWriter(self._path(kind), _arrow_schema(kind))
+        writer = self._writers[kind]
+        writer.write_table(pa.Table.from_pylist(batch, schema=writer.schema))
+
+    def close(self) -> List[str]:
+        if self.fmt == "parquet":
+            for kind in list(self._batches):
+                self._flush_parquet(kind)
+            for writer in self._writers.values():
+                writer.close()
+        for f in self._files:
+            f.close()
+        return [self._path(kind) for kind in self._writers]
+
+
+def _arrow_schema(kind: type) -> Any:
+    """Column types from the dataclass annotations (a batch of all-None values has none)."""
+    import pyarrow as pa
+
+    types = {datetime: pa.timestamp("ms"), str: pa.string(), int: pa.int64(), float: pa.float64()}
+    hints = get_type_hints(kind)
+    columns = []
+    for f in fields(kind):
+        hint = hints[f.name]
+        # Optional[X] -> X
+        hint = next((a for a in get_args(hint) if a is not type(None)), hint)
+        columns.append((f.name, types[hint]))
+    return pa.schema(columns)
+
+
+# --- Report ----------------------------------------------------------------
+
+def _latency_table(title: str, rows: Dict[str, Dict[str, Any]], extra: Optional[str] = None) -> None:
+    header = f"{title:<40} {'n':>6} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+    if extra:
+        header += f" {extra:>8}"
+    print(header)
+    print("-" * len(header))
+    for name, s in rows.items():
+        line = f"{name:<40} {s['count']:>6} {s['mean']:>9} {s['p50']:>9} {s['p90']:>9} {s['p99']:>9} {s['max']:>9}"
+        if extra:
+            line += f" {s[extra]:>8.1%}"
+        print(line)
+    print()
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    total = report["requests"]
+    print(f"window {report['window'][0]} .. {report['window'][1]}")
+    print(f"requests {total}  status {report['status']}  failed+rejected {report['error_rate']:.1%}\n")
+
+    print(f"{'hour':<17} {'ok':>6} {'rejected':>9} {'failed':>7}")
+    for hour, counts in report["hourly"].items():
+        print(f"{hour:<17} {counts.get('ok', 0):>6} {counts.get('rejected', 0):>9} {counts.get('failed', 0):>7}")
+    print()
+
+    _latency_table("end-to-end latency (ms)", report["latency_ms"])
+    _latency_table("upstream latency (ms, estimated)", report["upstreams"], extra="non_2xx_rate")
+
+    ok = sum(report["tools"].values())
+    print("tool mix: " + ", ".join(f"{tool} {n} ({n / ok:.0%})" for tool, n in report["tools"].items()))
+    if report["paths"]:
+        print("answered by: " + ", ".join(f"{path} {n}" for path, n in report["paths"].items()))
+    if report["errors_logged"]:
+        print("ERROR lines: " + ", ".join(f"{name} {n}" for name, n in report["errors_logged"].items()))
+
+
+def _records(args: argparse.Namespace) -> Iterator[Tuple[str, LogRecord]]:
+    since = datetime.fromisoformat(args.since) if args.since else None
+    until = datetime.fromisoformat(args.until) if args.until else None
+    for source, record in iter_merged_records({"api": args.api_log, "mcp": args.mcp_log}, not args.no_backups):
+        if since and record.ts < since:
+            continue
+        if until and record.ts >= until:
+            break
+        yield source, record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency and tool-mix report from the CurioBot logs.")
+    parser.add_argument("--api-log", default=DEFAULT_API_LOG)
+    parser.add_argument("--mcp-log", default=DEFAULT_MCP_LOG)
+    parser.add_argument("--no-backups", action="store_true", help="ignore rotated .1 ... .5 files")
+    parser.add_argument("--since", help="ISO date/time, e.g. 2025-11-20 or 2025-11-20T09:00")
+    parser.add_argument("--until", help="ISO date/time (exclusive)")
+    parser.add_argument("--in-flight", type=int, default=int(os.getenv("CURIOBOT_MAX_IN_FLIGHT", "1")),
+                        help="concurrent requests the API ran (default CURIOBOT_MAX_IN_FLIGHT or 1)")
+    out = parser.add_mutually_exclusive_group()
+    out.add_argument("--csv", metavar="DIR", help="write requests.csv and upstream_calls.csv to DIR")
+    out.add_argument("--parquet", metavar="DIR", help="write requests.parquet and upstream_calls.parquet (needs pyarrow)")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    writer = None
+    if args.parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--parquet needs pyarrow (pip install pyarrow); use --csv otherwise")
+        writer = RowWriter(args.parquet, "parquet")
+    elif args.csv:
+        writer = RowWriter(args.csv, "csv")
+
+    analytics = LogAnalytics(in_flight=max(1, args.in_flight))
+    for source, record in _records(args):
+        for row in analytics.feed(source, record):
+            if writer is not None:
+                writer.write(row)
+    for row in analytics.finish():
+        if writer is not None:
+            writer.write(row)
+
+    report = analytics.report()
+    if not report["requests"] and not report["upstreams"]:
+        print(f"No records found in {args.api_log} / {args.mcp_log}")
+        return
+    print_report(report)
+
+    if writer is not None:
+        print("\nwrote " + ", ".join(writer.close()))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Replay real CurioBot traffic from the API logs against a running API.
+
+Questions are streamed out of logs/curiobot.log and its rotated backups
+(.5 ... .1, oldest first) without loading the files into memory. Their logged
+timestamps rebuild the arrival process, which is replayed at 1x, Nx or as fast
+as possible, and the report shows how the service copes with that traffic mix:
+  - end-to-end latency percentiles, overall and per routed tool
+  - queueing delay in the API's admission queue (X-Queue-Wait-Ms header)
+  - service time (latency minus queueing delay)
+  - errors (429 = rejected by admission control), timeouts and how far the
+    replay fell behind schedule
+
+Usage:
+  python -m scripts.replay_traffic                       # real time (1x)
+  python -m scripts.replay_traffic --speed 10            # 10x faster arrivals
+  python -m scripts.replay_traffic --max --concurrency 8 # as fast as possible
+  python -m scripts.replay_traffic --limit 50 --json /tmp/replay.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from utils.log_stream import iter_questions
+from utils.stats import latency_summary
+
+DEFAULT_LOG = os.path.join("logs", "curiobot.log")
+API_BASE = os.getenv("API_BASE", "http://localhost:7421")
+
+
+def arrival_schedule(
+    questions: Iterator[Tuple[Any, str]],
+    speed: float,
+    max_gap_s: Optional[float],
+) -> Iterator[Tuple[float, str]]:
+    """
+    Turn logged (timestamp, question) pairs into (send offset in seconds, question).
+
+    Gaps between arrivals are divided by `speed`; gaps longer than `max_gap_s`
+    (idle nights, restarts) are capped first. speed=0 sends everything at once.
+    """
+    offset = 0.0
+    previous = None
+    for ts, question in questions:
+        if previous is not None:
+            gap = max(0.0, (ts - previous).total_seconds())
+            if max_gap_s is not None:
+                gap = min(gap, max_gap_s)
+            offset += gap / speed if speed > 0 else 0.0
+        previous = ts
+        yield offset, question
+
+
+async def send(
+    client: httpx.AsyncClient,
+    question: str,
+    slots: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    async with slots:
+        start = time.perf_counter()
+        outcome: Dict[str, Any] = {"question": question}
+        try:
+            response = await client.post("/query", json={"question": question})
+            outcome["status"] = response.status_code
+            if response.status_code == 200:
+                outcome["tool"] = response.json().get("tool") or "none"
+            wait = response.headers.get("X-Queue-Wait-Ms")
+            if wait is not None:
+                outcome["queue_ms"] = float(wait)
+        except httpx.TimeoutException:
+            outcome["status"] = "timeout"
+        except httpx.HTTPError as e:
+            outcome["status"] = type(e).__name__
+        outcome["latency_ms"] = (time.perf_counter() - start) * 1000
+        return outcome
+
+
+async def replay(
+    log_path: str,
+    api_base: str,
+    speed: float,
+    max_gap_s: Optional[float],
+    concurrency: int,
+    timeout_s: float,
+    limit: Optional[int],
+    priority: str,
+) -> Tuple[List[Dict[str, Any]], float, float]:
+    """Replay the log; returns (per-request outcomes, wall time s, worst schedule lag s)."""
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    pending: List[asyncio.Task] = []
+    max_lag = 0.0
+
+    headers = {"X-CurioBot-Priority": priority}
+    async with httpx.AsyncClient(base_url=api_base, timeout=timeout_s, limits=limits,
+                                 headers=headers) as client:
+        started = time.perf_counter()
+        schedule = arrival_schedule(iter_questions(log_path), speed, max_gap_s)
+        for i, (offset, question) in enumerate(schedule):
+            if limit is not None and i >= limit:
+                break
+            delay = offset - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            pending.append(asyncio.create_task(send(client, question, slots)))
+        outcomes = await asyncio.gather(*pending)
+        wall_s = time.perf_counter() - started
+
+    return list(outcomes), wall_s, max_lag
+
+
+def summarise(outcomes: List[Dict[str, Any]], wall_s: float, max_lag_s: float) -> Dict[str, Any]:
+    ok = [o for o in outcomes if o["status"] == 200]
+    queued = [o for o in ok if "queue_ms" in o]
+    by_tool: Dict[str, List[float]] = defaultdict(list)
+    for o in ok:
+        by_tool[o["tool"]].append(o["latency_ms"])
+
+    return {
+        "requests": len(outcomes),
+        "ok": len(ok),
+        "errors": dict(Counter(str(o["status"]) for o in outcomes if o["status"] != 200)),
+        "wall_s": round(wall_s, 1),
+        "throughput_rps": round(len(ok) / wall_s, 3) if wall_s else 0.0,
+        "max_schedule_lag_s": round(max_lag_s, 2),
+        "latency_ms": latency_summary(o["latency_ms"] for o in ok),
+        "queue_wait_ms": latency_summary(o["queue_ms"] for o in queued),
+        "service_ms": latency_summary(o["latency_ms"] - o["queue_ms"] for o in queued),
+        "by_tool": {tool: latency_summary(values) for tool, values in sorted(by_tool.items())},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"requests {report['requests']}  ok {report['ok']}  errors {report['errors'] or '-'}")
+    print(f"wall {report['wall_s']}s  throughput {report['throughput_rps']} req/s  "
+          f"max schedule lag {report['max_schedule_lag_s']}s\n")
+
+    header = f"{'':<16} {'n':>5} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = [("latency", report["latency_ms"]), ("queue wait", report["queue_wait_ms"]),
+            ("service", report["service_ms"])]
+    rows += [(f"  {tool}", summary) for tool, summary in report["by_tool"].items()]
+    for name, s in rows:
+        print(f"{name:<16} {s['count']:>5} {s['mean']:>9} {s['p50']:>9} {s['p90']:>9} "
+              f"{s['p99']:>9} {s['max']:>9}")
+    if not report["queue_wait_ms"]["count"] and report["ok"]:
+        print("\n(no X-Queue-Wait-Ms header in responses; queueing delay unavailable)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay logged CurioBot questions against the API.")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="API log file; rotated backups are included")
+    parser.add_argument("--api", default=API_BASE, help=f"API base URL (default {API_BASE})")
+    rate = parser.add_mutually_exclusive_group()
+    rate.add_argument("--speed", type=float, default=1.0, help="arrival speed-up factor (default 1x)")
+    rate.add_argument("--max", action="store_true", help="send as fast as --concurrency allows")
+    parser.add_argument("--max-gap", type=float, default=60.0,
+                        help="cap idle gaps between logged questions to this many seconds (0 = no cap)")
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--limit", type=int, help="replay only the first N questions")
+    parser.add_argument("--priority", choices=["interactive", "batch"], default="batch",
+                        help="admission lane to replay in (default batch)")
+    parser.add_argument("--json", type=pathlib.Path, help="also write the report as JSON")
+    args = parser.parse_args()
+
+    speed = 0.0 if args.max else args.speed
+    mode = "max rate" if args.max else f"{args.speed:g}x"
+    print(f"Replaying {args.log} against {args.api} at {mode}\n")
+
+    outcomes, wall_s, max_lag = asyncio.run(replay(
+        args.log, args.api, speed, args.max_gap or None, args.concurrency, args.timeout, args.limit,
+        args.priority,
+    ))
+    report = summarise(outcomes, wall_s, max_lag)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""Router accuracy-vs-latency benchmark.
+
+Runs a versioned, labelled corpus of questions through one or more router
+configurations and reports, per configuration:
+  - tool-selection accuracy
+  - arg-extraction accuracy (expected args, case-insensitive containment)
+  - JSON-parse fallback rate, locally repaired replies and re-asks
+  - latency percentiles
+
+The model backend is either a recorded-response fixture (default, fully offline)
+or any OpenAI-compatible endpoint (--base-url, e.g. a local stub server). The
+bundled fixtures are hand-written seeds (model "synthetic", no latencies): they
+exercise the benchmark and the parsing path, not a real model, and the report
+says so. Record a real one with --record.
+
+Routers are built like the MCP server builds them (same tool args schemas), so
+structured output and arg validation are part of what is measured.
+
+Usage:
+  python -m scripts.router_benchmark
+  python -m scripts.router_benchmark --configs llm,llm-cached --repeat 2
+  python -m scripts.router_benchmark --base-url http://localhost:8000/v1 --model my-model
+  python -m scripts.router_benchmark --base-url https://api.openai.com/v1 --configs llm,tiered --fast-model gpt-4.1-nano
+  python -m scripts.router_benchmark --base-url https://api.openai.com/v1 --record scripts/data/router_recorded_v2.json
+"""
+import os
+import tempfile
+
+# Keep benchmark chatter out of logs/ (which replay/analytics read, and which is
+# tracked); parse failures are counted in the report rather than logged.
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "curiobot_benchmark.log"))
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+import argparse
+import json
+import pathlib
+import re
+import time
+from types import SimpleNamespace
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.llm_router import LLMRouter
+from core.openai_config import DEFAULT_MODEL, ROUTER_FAST_MODEL, make_openai_client
+from core.speculation import predict
+from utils.stats import latency_summary
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+DEFAULT_CORPUS = DATA_DIR / "router_corpus_v2.jsonl"
+DEFAULT_FIXTURE = DATA_DIR / "router_recorded_v2.json"
+DEFAULT_FAST_MODEL = ROUTER_FAST_MODEL or "gpt-4.1-nano"
+# Model name of hand-written fixtures: their replies and latencies are not measurements.
+SYNTHETIC_MODEL = "synthetic"
+
+_QUESTION = re.compile(r"^Question: (.*)$", re.MULTILINE)
+
+
+def _question_from(messages: List[Dict[str, str]]) -> str:
+    for message in reversed(messages):
+        if message["role"] == "user":
+            match = _QUESTION.search(message["content"])
+            return match.group(1) if match else message["content"]
+    return ""
+
+
+def _completion(content: str) -> Any:
+    """Minimal object with the shape of an OpenAI chat completion."""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class RecordedClient:
+    """OpenAI-client stand-in that answers from a recorded-response fixture.
+
+    The fixture's top-level "responses" belong to its "model"; responses of
+    other models (e.g. a fast routing tier) live under "models".
+    """
+
+    def __init__(self, fixture: Dict[str, Any], replay_latency: bool = False) -> None:
+        self.responses: Dict[str, Dict[str, Dict[str, Any]]] = {
+            fixture.get("model"): fixture["responses"],
+            **{name: entry["responses"] for name, entry in fixture.get("models", {}).items()},
+        }
+        self.replay_latency = replay_latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages: List[Dict[str, str]], model: str = None, **_: Any) -> Any:
+        question = _question_from(messages)
+        responses = self.responses.get(model)
+        if responses is None:
+            raise LookupError(f"No recorded responses for model {model!r}")
+        if question not in responses:
+            raise LookupError(f"No recorded response for question: {question!r}")
+        recorded = responses[question]
+        if self.replay_latency:
+            time.sleep(recorded.get("latency_ms", 0) / 1000)
+        return _completion(recorded["content"])
+
+
+class RecordingClient:
+    """Wraps a real client and records every response (content + latency) per model."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+        self.responses: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages: List[Dict[str, str]], model: str, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        response = self._client.chat.completions.create(messages=messages, model=model, **kwargs)
+        self.responses.setdefault(model, {})[_question_from(messages)] = {
+            "content": response.choices[0].message.content,
+            "latency_ms": round((time.perf_counter() - start) * 1000),
+        }
+        return response
+
+
+# --- Router configurations -------------------------------------------------
+#
+# Each builder takes (client, model, fast_model) and returns (route_fn, router),
+# where route_fn(question) -> plan dict and router exposes the `stats` counters
+# and `tier_summary()`.
+
+RouteFn = Callable[[str], Dict[str, Any]]
+
+
+def _tool_args() -> Dict[str, Dict[str, Any]] | None:
+    """The tool args schemas the MCP server gives its router (imported lazily: it loads the server)."""
+    from server.curiobot_server import router_tool_args
+
+    return router_tool_args()
+
+
+def _plain_router(client: Any, model: str, fast_model: str) -> Tuple[RouteFn, LLMRouter]:
+    router = LLMRouter(client=client, model=model, fast_model="", tool_args=_tool_args())
+    return router.route, router
+
+
+def _cached_router(client: Any, model: str, fast_model: str) -> Tuple[RouteFn, LLMRouter]:
+    """Router behind an exact-match cache on the normalised question (hits need --repeat 2+)."""
+    router = LLMRouter(client=client, model=model, fast_model="", tool_args=_tool_args())
+    memo: Dict[str, Dict[str, Any]] = {}
+
+    def route(question: str) -> Dict[str, Any]:
+        key = " ".join(question.lower().split())
+        if key not in memo:
+            memo[key] = router.route(question)
+        return memo[key]
+
+    return route, router
+
+
+def _tiered_router(client: Any, model: str, fast_model: str) -> Tuple[RouteFn, LLMRouter]:
+    """Fast model first, escalating to `model` on low confidence or invalid plans."""
+    router = LLMRouter(client=client, model=model, fast_client=client, fast_model=fast_model,
+                       tool_args=_tool_args())
+    return router.route, router
+
+
+class _PredictorOnly:
+    """
+    The local speculation predictor scored as if it were the router (no LLM calls).
+    Its arg accuracy is roughly the best-case speculation hit rate; questions it
+    has no guess for count as direct_answer.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Counter = Counter()
+
+    def route(self, question: str) -> Dict[str, Any]:
+        self.stats["routes"] += 1
+        prediction = predict(question)
+        if prediction is None:
+            return {"tool": "direct_answer", "args": {}, "reason": "no prediction"}
+        self.stats["predictions"] += 1
+        return {"tool": prediction["tool"], "args": prediction["args"],
+                "reason": "predictor", "confidence": prediction["confidence"]}
+
+    def tier_summary(self) -> Dict[str, Any]:
+        return {"routes": self.stats["routes"], "escalation_rate": None, "escalations": {}, "latency_ms": {}}
+
+
+def _predictor_router(client: Any, model: str, fast_model: str) -> Tuple[RouteFn, _PredictorOnly]:
+    router = _PredictorOnly()
+    return router.route, router
+
+
+ROUTER_CONFIGS: Dict[str, Callable[[Any, str, str], Tuple[RouteFn, Any]]] = {
+    "llm": _plain_router,
+    "llm-cached": _cached_router,
+    "tiered": _tiered_router,
+    "predictor": _predictor_router,
+}
+
+# Configs run when --configs is not given ("tiered" needs fast-model responses;
+# "llm-cached" only differs from "llm" with --repeat 2 or more).
+DEFAULT_CONFIGS = ["llm", "predictor"]
+
+
+# --- Scoring ---------------------------------------------------------------
+
+def load_corpus(path: pathlib.Path) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _arg_matches(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, str):
+        return actual is not None and expected.lower() in str(actual).lower()
+    return expected == actual
+
+
+def run_config(
+    name: str,
+    client: Any,
+    model: str,
+    corpus: List[Dict[str, Any]],
+    repeat: int = 1,
+    fast_model: str = DEFAULT_FAST_MODEL,
+) -> Dict[str, Any]:
+    route, router = ROUTER_CONFIGS[name](client, model, fast_model)
+    latencies: List[float] = []
+    tool_ok = args_ok = errors = 0
+    failures: List[Dict[str, Any]] = []
+
+    for _ in range(repeat):
+        for case in corpus:
+            start = time.perf_counter()
+            try:
+                plan = route(case["question"])
+            except Exception as e:
+                errors += 1
+                failures.append({"id": case["id"], "error": f"{type(e).__name__}: {e}"})
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            tool_match = plan.get("tool") == case["expected_tool"]
+            args = plan.get("args") or {}
+            arg_match = tool_match and all(
+                _arg_matches(value, args.get(key)) for key, value in case["expected_args"].items()
+            )
+            tool_ok += tool_match
+            args_ok += arg_match
+            if not arg_match:
+                failures.append({"id": case["id"], "expected": case["expected_tool"],
+                                 "got": plan.get("tool"), "args": args})
+
+    total = len(corpus) * repeat
+    llm_calls = router.stats.get("calls", 0)
+    tiers = router.tier_summary()
+    return {
+        "config": name,
+        "questions": total,
+        "tool_accuracy": round(tool_ok / total, 3) if total else 0.0,
+        "arg_accuracy": round(args_ok / total, 3) if total else 0.0,
+        "parse_fallback_rate": round(router.stats.get("parse_fallbacks", 0) / llm_calls, 3) if llm_calls else 0.0,
+        "repaired": router.stats.get("repairs", 0),
+        "reasks": router.stats.get("reasks", 0),
+        "llm_calls": llm_calls,
+        "errors": errors,
+        "escalation_rate": tiers["escalation_rate"],
+        "latency_ms": latency_summary(latencies),
+        "tier_latency_ms": tiers["latency_ms"],
+        "failures": failures,
+    }
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    header = (f"{'config':<16} {'n':>4} {'tool acc':>9} {'arg acc':>8} {'fallback':>9} "
+              f"{'repair':>7} {'re-ask':>7} {'llm':>5} {'escal.':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        lat = r["latency_ms"]
+        escalation = "-" if r["escalation_rate"] is None else f"{r['escalation_rate']:.1%}"
+        print(f"{r['config']:<16} {r['questions']:>4} {r['tool_accuracy']:>9.1%} {r['arg_accuracy']:>8.1%} "
+              f"{r['parse_fallback_rate']:>9.1%} {r['repaired']:>7} {r['reasks']:>7} {r['llm_calls']:>5} {escalation:>7} "
+              f"{lat['p50']:>8} {lat['p90']:>8} {lat['p99']:>8}")
+    for r in results:
+        if r["errors"]:
+            first = next(f["error"] for f in r["failures"] if "error" in f)
+            print(f"\n{r['config']}: {r['errors']} routing calls failed, e.g. {first}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Router accuracy-vs-latency benchmark.")
+    parser.add_argument("--corpus", type=pathlib.Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--fixture", type=pathlib.Path, default=DEFAULT_FIXTURE,
+                        help="recorded responses used when --base-url is not given")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint (local stub or real API)")
+    parser.add_argument("--model", default=None, help=f"model name (default {DEFAULT_MODEL})")
+    parser.add_argument("--fast-model", default=DEFAULT_FAST_MODEL,
+                        help=f"fast-tier model for the 'tiered' config (default {DEFAULT_FAST_MODEL})")
+    parser.add_argument("--configs", default=",".join(DEFAULT_CONFIGS),
+                        help=f"comma-separated subset of: {', '.join(ROUTER_CONFIGS)}")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus per config")
+    parser.add_argument("--replay-latency", action="store_true",
+                        help="sleep for the recorded latency of each fixture response")
+    parser.add_argument("--record", type=pathlib.Path,
+                        help="with --base-url: save responses as a new fixture")
+    parser.add_argument("--json", type=pathlib.Path, help="also write full results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    model = args.model or DEFAULT_MODEL
+
+    recorder = None
+    warnings: List[str] = []
+    if args.base_url:
+        client: Any = make_openai_client(base_url=args.base_url,
+                                         api_key=os.getenv("OPENAI_API_KEY") or "stub")
+        if args.record:
+            client = recorder = RecordingClient(client)
+        backend = args.base_url
+    else:
+        with open(args.fixture, encoding="utf-8") as f:
+            fixture = json.load(f)
+        client = RecordedClient(fixture, replay_latency=args.replay_latency)
+        model = args.model or fixture.get("model") or DEFAULT_MODEL
+        backend = f"fixture {args.fixture.name}"
+        if fixture.get("model") == SYNTHETIC_MODEL:
+            warnings.append(
+                f"{args.fixture.name} is a hand-written synthetic fixture, not recorded model replies: "
+                "accuracy reflects that script and latencies are not measured. "
+                "Record a real fixture with --base-url ... --record."
+            )
+        elif args.replay_latency and not any("latency_ms" in r for r in fixture["responses"].values()):
+            warnings.append(f"{args.fixture.name} has no recorded latencies; --replay-latency has no effect.")
+
+    configs = [name for name in args.configs.split(",") if name]
+    if "llm-cached" in configs and args.repeat < 2:
+        warnings.append("llm-cached gets no cache hits with --repeat 1; it only repeats the llm row.")
+
+    print(f"Corpus {args.corpus.name} ({len(corpus)} questions), backend: {backend}, model: {model}\n")
+    results = [run_config(name, client, model, corpus, args.repeat, args.fast_model) for name in configs]
+    print_table(results)
+    for warning in warnings:
+        print(f"\nWARNING: {warning}")
+
+    if recorder is not None:
+        fixture = {"corpus": args.corpus.stem, "model": model, "source": args.base_url,
+                   "responses": recorder.responses.pop(model, {})}
+        if recorder.responses:
+            fixture["models"] = {name: {"responses": responses}
+                                 for name, responses in recorder.responses.items()}
+        args.record.write_text(json.dumps(fixture, indent=2) + "\n", encoding="utf-8")
+        print(f"\nRecorded {len(fixture['responses'])} responses to {args.record}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
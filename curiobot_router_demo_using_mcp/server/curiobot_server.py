@@ -1,65 +1,292 @@
 from __future__ import annotations
 
 import os
+import time
+import asyncio
 import datetime as dt
-from typing import Any, Dict, Optional
-
-import httpx
-from mcp.server.fastmcp import FastMCP
-
-from utils.logging_utils import LoggerFactory, TraceContext
-from core.llm_router import LLMRouter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from utils.timing import PhaseTimer
+
+_startup = PhaseTimer()
+# Warm-up phases that failed; the API reads them (curiobot://startup) to decide readiness.
+_startup_failed: List[str] = []
+
+with _startup.phase("import"):
+    import httpx
+    from mcp.server.fastmcp import FastMCP
+
+    from utils import json_codec
+    from utils.profiling import PROFILING_ENABLED, Profiler
+    from utils.logging_utils import LoggerFactory, TraceContext
+    from core.cache import FRESHNESS_TTL_S, TieredCache, cache_key, open_cache
+    from core.llm_router import LLMRouter
+    from core.openai_config import ROUTER_STRUCTURED_OUTPUT
+    from core.news_dedup import DEFAULT_THRESHOLD, dedupe_articles
+    from core.renderers import day_summary
+    from core.routing_types import args_schema
+    from core.speculation import SpeculationStats, plans_match, predict
+    from core.wiki_store import WikiStore
 
 LoggerFactory.configure()
 log = LoggerFactory.get_logger("curiobot.curiobot_server")
 
-router = LLMRouter()
-mcp = FastMCP("curiobot_server")
+# Hosts the tools talk to; the opt-in warm-up opens a pooled connection to each.
+UPSTREAM_HOSTS = [
+    "https://geocoding-api.open-meteo.com",
+    "https://api.open-meteo.com",
+    "https://newsapi.org",
+    "https://en.wikipedia.org",
+]
+
+# Optional local Wikipedia index (scripts/build_wiki_index.py). With WIKI_OFFLINE=true
+# get_wiki never goes to the network, e.g. in air-gapped environments.
+WIKI_INDEX_PATH = os.getenv("WIKI_INDEX_PATH")
+WIKI_OFFLINE = os.getenv("WIKI_OFFLINE", "false").lower() == "true"
+
+_router: LLMRouter | None = None
+_http: httpx.AsyncClient | None = None
+_wiki_store: WikiStore | None = None
+_profiler: Profiler | None = Profiler() if PROFILING_ENABLED else None
+
+# Start the predicted tool call while the router is still deciding (see core/speculation.py).
+SPECULATION_ENABLED = os.getenv("CURIOBOT_SPECULATION", "false").lower() == "true"
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("CURIOBOT_SPECULATION_MIN_CONFIDENCE", "0.6"))
+SPECULATION_LOG_EVERY = 50
+_speculation = SpeculationStats()
+
+# Router plans, in the cache file shared with the API (CURIOBOT_CACHE=true).
+# Opened in the lifespan, not at import; stays None if that fails.
+_cache: TieredCache | None = None
+PLAN_CACHE_TOOLS = ("get_weather", "get_news", "get_wiki")
+
+
+def router_tool_args() -> Dict[str, Dict[str, Any]] | None:
+    """
+    Args schemas of the tools below, which constrain the router's plans (strict
+    structured output, unknown-arg checks); None with ROUTER_STRUCTURED_OUTPUT=false.
+    Also used by scripts/router_benchmark.py so it measures the same router.
+    """
+    if not ROUTER_STRUCTURED_OUTPUT:
+        return None
+    return {fn.__name__: args_schema(fn) for fn in (get_weather, get_news, get_wiki)}
+
+
+def get_router() -> LLMRouter:
+    """Build the LLMRouter on first use instead of at import time."""
+    global _router
+    if _router is None:
+        _router = LLMRouter(tool_args=router_tool_args())
+    return _router
+
+
+def wiki_store() -> WikiStore | None:
+    """Open the local Wikipedia index on first use, if one is configured."""
+    global _wiki_store
+    if _wiki_store is None and WIKI_INDEX_PATH:
+        if os.path.isfile(WIKI_INDEX_PATH):
+            _wiki_store = WikiStore(WIKI_INDEX_PATH)
+            log.info("get_wiki: using local index %s", WIKI_INDEX_PATH)
+        else:
+            log.warning("WIKI_INDEX_PATH=%s does not exist; using the network", WIKI_INDEX_PATH)
+    return _wiki_store
+
+
+def http_client() -> httpx.AsyncClient:
+    """Shared pooled client so TLS connections are reused across tool calls."""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            timeout=20,
+            limits=httpx.Limits(keepalive_expiry=120),
+        )
+    return _http
+
+
+async def warmup() -> None:
+    """Build the router, open upstream connections and issue a tiny routing call.
+
+    Failed phases are recorded in `_startup_failed` rather than raised: the
+    server still starts, and the API reports it as not ready.
+    """
+    try:
+        with _startup.phase("router_init"):
+            router = get_router()
+    except Exception:
+        log.exception("warm-up: could not build the router")
+        _startup_failed.append("router_init")
+        router = None
+
+    async def _touch(url: str) -> bool:
+        try:
+            await http_client().head(url)
+            return True
+        except httpx.HTTPError as e:
+            log.warning("warm-up: could not reach %s: %s", url, e)
+            return False
+
+    with _startup.phase("upstream_connect"):
+        reached = await asyncio.gather(*(_touch(url) for url in UPSTREAM_HOSTS))
+    if not all(reached):
+        _startup_failed.append("upstream_connect")
+
+    if router is not None:
+        with _startup.phase("router_call"):
+            if await asyncio.to_thread(router.warmup):
+                _startup_failed.append("router_call")
+
+
+@asynccontextmanager
+async def lifespan(_server: FastMCP) -> AsyncIterator[None]:
+    # The lifespan runs before the MCP initialize handshake completes, so the
+    # parent only sees the server once warm-up has finished.
+    global _cache
+    with _startup.phase("cache_open"):
+        _cache = await asyncio.to_thread(open_cache)
+    if os.getenv("CURIOBOT_WARMUP", "false").lower() == "true":
+        with _startup.phase("warmup"):
+            await warmup()
+    log.info("MCP CurioBot server startup report=%s", _startup.report())
+    try:
+        yield
+    finally:
+        if _http is not None:
+            await _http.aclose()
+
+
+mcp = FastMCP("curiobot_server", lifespan=lifespan)
+
+
+@mcp.resource("curiobot://startup", mime_type="application/json")
+def startup_status() -> str:
+    """Startup timing report and failed warm-up phases, for the API's readiness flag."""
+    return json_codec.dumps({"report": _startup.report(), "failed": _startup_failed})
+
+
+FORECAST_HOURLY = "temperature_2m,precipitation_probability,weathercode"
+
+
+async def _geocode(client: httpx.AsyncClient, location: str) -> Optional[Dict[str, Any]]:
+    """First Open-Meteo geocoding match for `location`, or None."""
+    geo = await client.get(
+        "https://geocoding-api.open-meteo.com/v1/search",
+        params={"name": location, "count": 1},
+    )
+    geo.raise_for_status()
+    results = json_codec.loads(geo.content).get("results")
+    return results[0] if results else None
+
+
+def _target_date(when: Optional[str]) -> dt.date:
+    target_date = dt.date.today()
+    if when and "tomorrow" in when.lower():
+        target_date += dt.timedelta(days=1)
+    return target_date
 
 
 @mcp.tool(
     name="get_weather",
-    description="Weather via Open-Meteo for a location. 'when' accepts 'today'/'tomorrow'.",
+    description=(
+        "Weather via Open-Meteo for a location. 'when' accepts 'today'/'tomorrow'. "
+        "To compare several places, pass 'locations' (a list of names) instead of 'location'."
+    ),
 )
-async def get_weather(location: str, when: Optional[str] = None) -> Dict[str, Any]:
-    log.info("curio Bot MCP Sever - get_weather invoked, location=%s, when=%s", location, when)
-
-    async with httpx.AsyncClient(timeout=20) as client:
-        geo = await client.get(
-            "https://geocoding-api.open-meteo.com/v1/search",
-            params={"name": location, "count": 1},
-        )
-        geo.raise_for_status()
-        g = geo.json()
-
-        if not g.get("results"):
-            return {"ok": False, "error": "location_not_found"}
-
-        r = g["results"][0]
-        lat, lon = r["latitude"], r["longitude"]
-
-        target_date = dt.date.today()
-        if when and "tomorrow" in when.lower():
-            target_date += dt.timedelta(days=1)
-
-        weather = await client.get(
-            "https://api.open-meteo.com/v1/forecast",
-            params={
-                "latitude": lat,
-                "longitude": lon,
-                "hourly": "temperature_2m,precipitation_probability,weathercode",
-                "timezone": "auto",
-                "forecast_days": 2,
-            },
-        )
-        weather.raise_for_status()
-
-        return {
-            "ok": True,
-            "location": r,
-            "forecast": weather.json(),
-            "target_date": str(target_date),
-        }
+async def get_weather(
+    location: Optional[str] = None,
+    when: Optional[str] = None,
+    locations: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    log.info(
+        "curio Bot MCP Sever - get_weather invoked, location=%s, locations=%s, when=%s",
+        location, locations, when,
+    )
+
+    if locations:
+        return await _get_weather_many(locations, when)
+    if not location:
+        return {"ok": False, "error": "location_missing"}
+
+    client = http_client()
+    r = await _geocode(client, location)
+    if r is None:
+        return {"ok": False, "error": "location_not_found"}
+
+    lat, lon = r["latitude"], r["longitude"]
+    target_date = _target_date(when)
+
+    weather = await client.get(
+        "https://api.open-meteo.com/v1/forecast",
+        params={
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": FORECAST_HOURLY,
+            "timezone": "auto",
+            "forecast_days": 2,
+        },
+    )
+    weather.raise_for_status()
+
+    return {
+        "ok": True,
+        "location": r,
+        "forecast": json_codec.loads(weather.content),
+        "target_date": str(target_date),
+    }
+
+
+async def _get_weather_many(names: List[str], when: Optional[str]) -> Dict[str, Any]:
+    """
+    Multi-location mode: geocode every name concurrently, then fetch all
+    forecasts in one Open-Meteo request (it accepts comma-separated
+    latitude/longitude lists), so N cities cost about as much as one.
+    """
+    client = http_client()
+    names = list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+    geocoded = await asyncio.gather(*(_geocode(client, name) for name in names))
+
+    found = [(name, r) for name, r in zip(names, geocoded) if r is not None]
+    not_found = [name for name, r in zip(names, geocoded) if r is None]
+    if not found:
+        return {"ok": False, "error": "location_not_found", "not_found": not_found}
+
+    target_date = _target_date(when)
+    weather = await client.get(
+        "https://api.open-meteo.com/v1/forecast",
+        params={
+            "latitude": ",".join(str(r["latitude"]) for _, r in found),
+            "longitude": ",".join(str(r["longitude"]) for _, r in found),
+            "hourly": FORECAST_HOURLY,
+            "timezone": "auto",
+            "forecast_days": 2,
+        },
+    )
+    weather.raise_for_status()
+    forecasts = json_codec.loads(weather.content)
+    if isinstance(forecasts, dict):
+        # A single coordinate pair comes back as an object, not a list.
+        forecasts = [forecasts]
+
+    return {
+        "ok": True,
+        "target_date": str(target_date),
+        "locations": [
+            {
+                "name": name,
+                "location": r,
+                "summary": day_summary(forecast, target_date),
+            }
+            for (name, r), forecast in zip(found, forecasts)
+        ],
+        "not_found": not_found,
+    }
+
+
+# Distinct stories returned by get_news, and how many results it fetches per story
+# so that syndicated copies can be collapsed without running short.
+NEWS_TOP_K = int(os.getenv("NEWS_TOP_K", "5"))
+NEWS_OVERFETCH = int(os.getenv("NEWS_OVERFETCH", "4"))
+NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", str(DEFAULT_THRESHOLD)))
 
 
 @mcp.tool(name="get_news", description="Topical news via NewsAPI. Requires NEWSAPI_KEY env var.")
@@ -78,54 +305,81 @@ async def get_news(query: str| None = None, freshness_days: int = 3, topic: str
 
     from_dt = (dt.datetime.utcnow() - dt.timedelta(days=freshness_days)).date().isoformat()
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        resp = await client.get(
-            "https://newsapi.org/v2/everything",
-            params={
-                "q": query,
-                "from": from_dt,
-                "sortBy": "publishedAt",
-                "pageSize": 5,
-                "language": "en",
-                "apiKey": key,
-            },
-        )
-
-        if resp.status_code != 200:
-            return {"ok": False, "status": resp.status_code, "text": resp.text}
-
-        return {"ok": True, **resp.json()}
+    client = http_client()
+    resp = await client.get(
+        "https://newsapi.org/v2/everything",
+        params={
+            "q": query,
+            "from": from_dt,
+            "sortBy": "publishedAt",
+            "pageSize": min(100, NEWS_TOP_K * NEWS_OVERFETCH),
+            "language": "en",
+            "apiKey": key,
+        },
+    )
+
+    if resp.status_code != 200:
+        return {"ok": False, "status": resp.status_code, "text": resp.text}
+
+    data = json_codec.loads(resp.content)
+    fetched = data.get("articles") or []
+    articles = dedupe_articles(fetched, top_k=NEWS_TOP_K, threshold=NEWS_DEDUP_THRESHOLD)
+    log.info("get_news: fetched=%d distinct_returned=%d", len(fetched), len(articles))
+
+    return {
+        "ok": True,
+        **data,
+        "articles": articles,
+        "dedup": {"fetched": len(fetched), "returned": len(articles)},
+    }
 
 
 @mcp.tool(name="get_wiki", description="Wikipedia summary for a topic.")
 async def get_wiki(topic: str) -> Dict[str, Any]:
     log.info("curio Bot MCP Sever - get_wiki invoked, topic=%s", topic)
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        s = await client.get(
-            "https://en.wikipedia.org/w/api.php",
-            params={
-                "action": "query",
-                "list": "search",
-                "srsearch": topic,
-                "format": "json",
-            },
-        )
-        s.raise_for_status()
-
-        items = s.json().get("query", {}).get("search", [])
-        if not items:
-            return {"ok": False, "error": "not_found"}
-
-        title = items[0]["title"]
-        e = await client.get(
-            "https://en.wikipedia.org/api/rest_v1/page/summary/" + title
-        )
-
-        if e.status_code != 200:
-            return {"ok": False, "status": e.status_code, "text": e.text}
-
-        return {"ok": True, **e.json()}
+    store = wiki_store()
+    if store is not None:
+        # Synchronous SQLite FTS: run it off the event loop like the tiered cache does.
+        page = await asyncio.to_thread(store.lookup, topic)
+        if page is not None:
+            log.info("get_wiki: local index hit title=%s", page["title"])
+            return {
+                "ok": True,
+                "title": page["title"],
+                "extract": page["abstract"],
+                "content_urls": {"desktop": {"page": page["url"]}},
+                "source": "local_index",
+            }
+        log.info("get_wiki: local index miss topic=%s", topic)
+    if WIKI_OFFLINE:
+        return {"ok": False, "error": "not_found", "source": "local_index"}
+
+    client = http_client()
+    s = await client.get(
+        "https://en.wikipedia.org/w/api.php",
+        params={
+            "action": "query",
+            "list": "search",
+            "srsearch": topic,
+            "format": "json",
+        },
+    )
+    s.raise_for_status()
+
+    items = json_codec.loads(s.content).get("query", {}).get("search", [])
+    if not items:
+        return {"ok": False, "error": "not_found"}
+
+    title = items[0]["title"]
+    e = await client.get(
+        "https://en.wikipedia.org/api/rest_v1/page/summary/" + title
+    )
+
+    if e.status_code != 200:
+        return {"ok": False, "status": e.status_code, "text": e.text}
+
+    return {"ok": True, **json_codec.loads(e.content)}
 
 
 @mcp.tool(
@@ -133,6 +387,17 @@ async def get_wiki(topic: str) -> Dict[str, Any]:
     description="Natural language router: decides among get_weather/get_news/get_wiki, or replies directly.",
 )
 async def query(question: str) -> Dict[str, Any]:
+    # The API asks for a profile of this call by arming it (see utils/profiling.py).
+    if _profiler is None:
+        return await _query(question)
+    profile_id = await asyncio.to_thread(_profiler.store.claim_armed)
+    if profile_id is None:
+        return await _query(question)
+    async with _profiler.acapture(f"{profile_id}-mcp", {"source": "mcp", "question": question}):
+        return await _query(question)
+
+
+async def _query(question: str) -> Dict[str, Any]:
     """LLMRouter → plan = {"tool": ..., "args": {...}, "reason": ...}
 
     This MCP tool:
@@ -146,7 +411,32 @@ async def query(question: str) -> Dict[str, Any]:
     """
     log.info("curio Bot MCP Sever - query tool invoked for question=%s", question)
 
-    raw_plan = router.route(question)
+    # Routing decisions do not go stale like tool results, so plans are cached on
+    # their own: a repeated question skips the routing call even after its
+    # answer has expired from the API's result cache.
+    key = cache_key(question)[0] if _cache is not None else None
+    plan = await _cache.aget("plan", key) if key is not None else None
+    if plan is not None:
+        log.info("query: plan from cache")
+        result = await _dispatch(plan.get("tool") or "direct_answer", plan.get("args") or {})
+        return {"plan": plan, "result": result}
+
+    prediction = predict(question) if SPECULATION_ENABLED else None
+    speculative: asyncio.Task | None = None
+    if prediction is not None and prediction["confidence"] >= SPECULATION_MIN_CONFIDENCE:
+        log.info("query: speculative %s args=%s", prediction["tool"], prediction["args"])
+        speculative = asyncio.create_task(_timed_dispatch(prediction["tool"], prediction["args"]))
+
+    # The router's OpenAI client is synchronous; run it off the event loop so the
+    # speculative fetch (and other tool calls) progress meanwhile.
+    routing_started = time.perf_counter()
+    try:
+        raw_plan = await asyncio.to_thread(get_router().route, question)
+    except BaseException:
+        if speculative is not None:
+            _discard(speculative)
+        raise
+    routing_ms = (time.perf_counter() - routing_started) * 1000
 
     if hasattr(raw_plan, "model_dump"):
         plan = raw_plan.model_dump()
@@ -161,33 +451,91 @@ async def query(question: str) -> Dict[str, Any]:
     log.info("query.plan.toolname=%s", toolname)
     log.info("query.plan.args=%s", args)
 
+    # Only tool plans: a direct answer may be time-sensitive, and a fallback is a failure.
+    if key is not None and toolname in PLAN_CACHE_TOOLS:
+        await _cache.aset("plan", key, plan, FRESHNESS_TTL_S["reference"])
+
+    result = None
+    if SPECULATION_ENABLED:
+        result = await _resolve_speculation(speculative, prediction, plan, routing_ms)
+    if result is None:
+        result = await _dispatch(toolname, args)
+
+    return {"plan": plan, "result": result}
+
+
+async def _dispatch(toolname: str, args: Dict[str, Any]) -> Dict[str, Any]:
     if toolname == "get_weather":
         log.info("query: dispatching to get_weather")
-        result = await get_weather(**args)
+        return await get_weather(**args)
 
-    elif toolname == "get_news":
+    if toolname == "get_news":
         log.info("query: dispatching to get_news")
-        result = await get_news(**args)
+        return await get_news(**args)
 
-    elif toolname == "get_wiki":
+    if toolname == "get_wiki":
         log.info("query: dispatching to get_wiki")
-        result = await get_wiki(**args)
+        return await get_wiki(**args)
 
-    elif toolname == "direct_answer":
+    if toolname == "direct_answer":
         answer_text = args.get("answer") or "No answer provided by router."
-        result = {"ok": True, "answer": answer_text}
         log.info("query: direct_answer used")
-
-    else:
-        log.warning("query: unknown tool '%s'; returning error result", toolname)
-        result = {
-            "ok": False,
-            "error": "unknown_tool",
-            "tool": toolname,
-            "args": args,
-        }
-
-    return {"plan": plan, "result": result}
+        return {"ok": True, "answer": answer_text}
+
+    log.warning("query: unknown tool '%s'; returning error result", toolname)
+    return {
+        "ok": False,
+        "error": "unknown_tool",
+        "tool": toolname,
+        "args": args,
+    }
+
+
+async def _timed_dispatch(toolname: str, args: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    started = time.perf_counter()
+    result = await _dispatch(toolname, args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _discard(task: asyncio.Task) -> None:
+    """Cancel a speculative fetch, or retrieve its outcome so a failure is not reported as unhandled."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+async def _resolve_speculation(
+    task: asyncio.Task | None,
+    prediction: Dict[str, Any] | None,
+    plan: Dict[str, Any],
+    routing_ms: float,
+) -> Dict[str, Any] | None:
+    """Use the speculative result if it fetched what `plan` asks for; otherwise drop it."""
+    try:
+        if task is None:
+            _speculation.record("none")
+            return None
+
+        if not plans_match(prediction, plan):
+            _speculation.record("wasted" if task.done() else "cancelled")
+            _discard(task)
+            log.info("query: speculation miss predicted=%s", prediction["tool"])
+            return None
+
+        try:
+            result, fetch_ms = await task
+        except Exception:
+            log.exception("query: speculative fetch failed; re-running the plan")
+            _speculation.record("error")
+            return None
+        hidden_ms = min(fetch_ms, routing_ms)
+        _speculation.record("hit", hidden_ms=hidden_ms)
+        log.info("query: speculation hit tool=%s hidden_ms=%.1f", plan.get("tool"), hidden_ms)
+        return result
+    finally:
+        if _speculation.total % SPECULATION_LOG_EVERY == 0:
+            log.info("query: speculation summary=%s", _speculation.summary())
 
 
 if __name__ == "__main__":
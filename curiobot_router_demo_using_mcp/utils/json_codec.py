@@ -0,0 +1,81 @@
+"""Pluggable JSON codec shared by the API, MCP server, router and UI.
+
+Uses orjson when it is installed and the standard library otherwise; both
+produce the same JSON (UTF-8, no ASCII escaping). Set CURIOBOT_JSON=json to
+force the stdlib codec, e.g. to rule the codec out while debugging.
+
+Usage:
+    from utils import json_codec
+    body = json_codec.dumps_bytes(payload)
+    data = json_codec.loads(body)
+"""
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+Default = Optional[Callable[[Any], Any]]
+
+
+class StdlibCodec:
+    name = "json"
+
+    def dumps_bytes(self, obj: Any, indent: bool = False, default: Default = None) -> bytes:
+        return self.dumps(obj, indent=indent, default=default).encode("utf-8")
+
+    def dumps(self, obj: Any, indent: bool = False, default: Default = None) -> str:
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def dumps_bytes(self, obj: Any, indent: bool = False, default: Default = None) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+
+    def dumps(self, obj: Any, indent: bool = False, default: Default = None) -> str:
+        return self.dumps_bytes(obj, indent=indent, default=default).decode("utf-8")
+
+    def loads(self, data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+
+def available_codecs() -> Dict[str, Any]:
+    """Every codec usable in this environment, by name."""
+    codecs: Dict[str, Any] = {"json": StdlibCodec()}
+    if orjson is not None:
+        codecs["orjson"] = OrjsonCodec()
+    return codecs
+
+
+def _select() -> Any:
+    codecs = available_codecs()
+    wanted = os.getenv("CURIOBOT_JSON", "auto").lower()
+    if wanted in codecs:
+        return codecs[wanted]
+    return codecs.get("orjson", codecs["json"])
+
+
+codec = _select()
+
+
+def dumps(obj: Any, indent: bool = False, default: Default = None) -> str:
+    return codec.dumps(obj, indent=indent, default=default)
+
+
+def dumps_bytes(obj: Any, indent: bool = False, default: Default = None) -> bytes:
+    return codec.dumps_bytes(obj, indent=indent, default=default)
+
+
+def loads(data: str | bytes) -> Any:
+    return codec.loads(data)
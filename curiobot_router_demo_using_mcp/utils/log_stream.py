@@ -0,0 +1,99 @@
+import heapq
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Matches the "std" formatter in LoggerFactory:
+#   2025-11-16 21:13:48,564 INFO [curiobot.api.main_agent] Question=...
+_RECORD = re.compile(
+    r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) "
+    r"(?P<level>[A-Z]+) \[(?P<logger>[^\]]+)\] (?P<message>.*)$"
+)
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+# Current format first, then the older "********** question=" lines.
+_QUESTION_PREFIXES = ("Question=", "********** question=")
+
+# Same as the RotatingFileHandler in LoggerFactory.
+BACKUP_COUNT = 5
+
+
+@dataclass
+class LogRecord:
+    ts: datetime
+    level: str
+    logger: str
+    message: str
+
+
+def rotated_log_files(path: str, backup_count: int = BACKUP_COUNT) -> List[str]:
+    """Existing files of a rotated log, oldest first: path.5, ..., path.1, path."""
+    candidates = [f"{path}.{i}" for i in range(backup_count, 0, -1)] + [path]
+    return [p for p in candidates if os.path.isfile(p)]
+
+
+def iter_log_records(path: str, include_backups: bool = True) -> Iterator[LogRecord]:
+    """
+    Stream records from a log file (and its rotated backups) in time order.
+
+    Files are read line by line, so memory use does not depend on log size.
+    Lines that do not start a new record (e.g. tracebacks, multi-line summaries)
+    are appended to the message of the preceding record.
+    """
+    files = rotated_log_files(path) if include_backups else [path]
+    for file_path in files:
+        current: Optional[LogRecord] = None
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                match = _RECORD.match(line)
+                if match is None:
+                    if current is not None:
+                        current.message += "\n" + line
+                    continue
+                if current is not None:
+                    yield current
+                current = LogRecord(
+                    ts=datetime.strptime(match["ts"], _TS_FORMAT),
+                    level=match["level"],
+                    logger=match["logger"],
+                    message=match["message"],
+                )
+        if current is not None:
+            yield current
+
+
+def _tagged(source: str, path: str, include_backups: bool) -> Iterator[Tuple[str, LogRecord]]:
+    for record in iter_log_records(path, include_backups):
+        yield source, record
+
+
+def iter_merged_records(paths: Dict[str, str], include_backups: bool = True) -> Iterator[Tuple[str, LogRecord]]:
+    """
+    Stream (source, record) from several logs (e.g. {"api": ..., "mcp": ...})
+    interleaved in time order; still one line per file in memory at a time.
+    """
+    streams = [
+        _tagged(source, path, include_backups)
+        for source, path in paths.items()
+        if os.path.isfile(path) or (include_backups and rotated_log_files(path))
+    ]
+    return heapq.merge(*streams, key=lambda item: item[1].ts)
+
+
+def question_of(record: LogRecord) -> Optional[str]:
+    """The question text if `record` is an API "Question=" line, else None."""
+    for prefix in _QUESTION_PREFIXES:
+        if record.message.startswith(prefix):
+            return record.message[len(prefix):].strip()
+    return None
+
+
+def iter_questions(path: str, include_backups: bool = True) -> Iterator[Tuple[datetime, str]]:
+    """Stream (timestamp, question) pairs of every non-empty question the API logged."""
+    for record in iter_log_records(path, include_backups):
+        question = question_of(record)
+        if question:
+            yield record.ts, question
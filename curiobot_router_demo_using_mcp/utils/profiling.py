@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+# Strictly opt-in: with profiling disabled nothing below runs on the request path.
+PROFILING_ENABLED = os.getenv("CURIOBOT_PROFILING", "false").lower() == "true"
+PROFILE_DIR = os.getenv("CURIOBOT_PROFILE_DIR", os.path.join("logs", "profiles"))
+SAMPLE_INTERVAL_MS = float(os.getenv("CURIOBOT_PROFILE_INTERVAL_MS", "5"))
+MAX_STACK_DEPTH = 128
+
+_THREAD_NAME = "curiobot-profiler"
+_PROFILE_ID = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{6}(-mcp)?$")
+
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler for the current process.
+
+    A background thread snapshots every other thread's Python stack every
+    `interval_ms` and counts identical stacks. The result is in "folded" form
+    (`thread;outer;...;inner count` per line), which flamegraph.pl, speedscope
+    and most flamegraph viewers read directly. Time spent awaiting shows up
+    under the event loop's select() call.
+    """
+
+    def __init__(self, interval_ms: float = SAMPLE_INTERVAL_MS) -> None:
+        self.interval_s = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=_THREAD_NAME, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if names.get(ident) == _THREAD_NAME:
+                    continue
+                frames: List[str] = []
+                while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                frames.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def requested_mode(value: Optional[str]) -> Optional[str]:
+    """
+    Profiling mode asked for by a request flag: "api" (this process only), "all"
+    (also the MCP child's query tool call) or None. Always None unless
+    CURIOBOT_PROFILING=true.
+    """
+    if not PROFILING_ENABLED or not value:
+        return None
+    value = value.strip().lower()
+    if value in ("0", "false", "no", "off"):
+        return None
+    return "all" if value in ("all", "mcp") else "api"
+
+
+def new_profile_id() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+
+class ProfileStore:
+    """
+    Profiles on disk: `<id>.folded` (collapsed stacks) plus `<id>.json` metadata.
+
+    Also carries the "arm" files the API uses to ask the MCP child to profile
+    its next `query` tool call under `<id>-mcp`.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR) -> None:
+        self.directory = directory
+
+    def save(self, profile_id: str, sampler: StackSampler, meta: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(sampler.folded())
+        meta = {
+            "id": profile_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "samples": sampler.samples,
+            "interval_ms": sampler.interval_s * 1000,
+            **meta,
+        }
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return path
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+        return profiles
+
+    def path_for(self, profile_id: str) -> Optional[str]:
+        """Path of a stored profile; None for unknown or malformed ids."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        return path if os.path.isfile(path) else None
+
+    # --- Arming the MCP child -----------------------------------------------
+
+    def arm(self, profile_id: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        open(os.path.join(self.directory, f"{profile_id}.arm"), "w").close()
+
+    def disarm(self, profile_id: str) -> None:
+        try:
+            os.unlink(os.path.join(self.directory, f"{profile_id}.arm"))
+        except FileNotFoundError:
+            pass
+
+    def claim_armed(self) -> Optional[str]:
+        """
+        Take the pending arm request; returns its profile id, or None.
+
+        Arm files do not say which call they are for, so with more than one
+        pending (profiled requests from several API workers) none is claimed:
+        a missing child profile is better than one of another request. The API
+        removes unclaimed arm files when its request ends.
+        """
+        if not os.path.isdir(self.directory):
+            return None
+        pending = [name for name in os.listdir(self.directory) if name.endswith(".arm")]
+        if len(pending) != 1:
+            return None
+        try:
+            os.unlink(os.path.join(self.directory, pending[0]))
+        except FileNotFoundError:
+            return None  # claimed by someone else
+        return pending[0][: -len(".arm")]
+
+
+class Profiler:
+    """
+    One-at-a-time request profiler.
+
+    Only one capture runs per process: the sampler sees every thread, so
+    overlapping captures would attribute each other's work. A request that
+    asks for a profile while another is being captured runs unprofiled.
+    """
+
+    def __init__(self, store: Optional[ProfileStore] = None) -> None:
+        self.store = store or ProfileStore()
+        self._busy = threading.Lock()
+
+    @contextmanager
+    def capture(self, profile_id: str, meta: Dict[str, Any]) -> Iterator[Optional[str]]:
+        """Profile the body; yields `profile_id`, or None if another capture is running."""
+        started = self._begin()
+        if started is None:
+            yield None
+            return
+        sampler, t0 = started
+        try:
+            yield profile_id
+        finally:
+            self._finish(sampler, t0, profile_id, meta)
+
+    @asynccontextmanager
+    async def acapture(self, profile_id: str, meta: Dict[str, Any]) -> AsyncIterator[Optional[str]]:
+        """`capture` for async callers: stopping the sampler and writing the files run off the event loop."""
+        started = self._begin()
+        if started is None:
+            yield None
+            return
+        sampler, t0 = started
+        try:
+            yield profile_id
+        finally:
+            await asyncio.to_thread(self._finish, sampler, t0, profile_id, meta)
+
+    def _begin(self) -> Optional[Tuple[StackSampler, float]]:
+        if not self._busy.acquire(blocking=False):
+            return None
+        sampler = StackSampler()
+        started = time.perf_counter()
+        sampler.start()
+        return sampler, started
+
+    def _finish(self, sampler: StackSampler, started: float, profile_id: str, meta: Dict[str, Any]) -> None:
+        sampler.stop()
+        meta = {**meta, "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+        try:
+            self.store.save(profile_id, sampler, meta)
+        finally:
+            self._busy.release()
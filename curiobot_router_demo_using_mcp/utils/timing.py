@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class PhaseTimer:
+    """Records wall-clock durations (ms) of named phases, e.g. during startup.
+
+    Usage:
+        timer = PhaseTimer()
+        with timer.phase("mcp_spawn"):
+            ...
+        log.info("startup report=%s", timer.report())
+    """
+
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def report(self) -> Dict[str, float]:
+        return {
+            **self.phases,
+            "total_ms": round((time.perf_counter() - self._t0) * 1000, 1),
+        }
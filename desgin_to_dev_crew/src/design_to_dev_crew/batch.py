@@ -0,0 +1,148 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import yaml
+
+from design_to_dev_crew.checkpoint import RunCheckpoint
+from design_to_dev_crew.tools.file_writer import OUTPUT_DIR_ENV
+
+# Number of specs run at the same time (each in its own process).
+DEFAULT_PARALLELISM = int(os.getenv("CREW_BATCH_PARALLELISM", "2"))
+
+REQUIRED_KEYS = ["requirements"]
+
+# Same defaults main.run() offers at its prompts.
+DEFAULT_INPUTS = {
+    "app_name": "tutoring-session-manager",
+    "frontend_module_name": "frontend-app",
+    "backend_module_name": "backend-service",
+    "package_name_prefix": "com.example.app",
+}
+
+
+def load_spec(path: str) -> Dict[str, str]:
+    """
+    Read one requirement spec (YAML or JSON) into crew inputs.
+
+    Expected keys: requirements (required), app_name, frontend_module_name,
+    backend_module_name, package_name_prefix (defaults as in main.run()).
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+        else:
+            data = yaml.safe_load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: spec must be a mapping")
+    missing = [key for key in REQUIRED_KEYS if not data.get(key)]
+    if missing:
+        raise ValueError(f"{path}: missing required keys {missing}")
+
+    inputs = {**DEFAULT_INPUTS, **{k: v for k, v in data.items() if v}}
+    return {key: str(inputs[key]) for key in REQUIRED_KEYS + list(DEFAULT_INPUTS)}
+
+
+def spec_output_dir(spec_path: str, index: int, output_root: str) -> str:
+    """
+    `<output_root>/<NN>-<spec name>/` for the spec at position `index` of the batch.
+
+    The index keeps same-named specs from different directories (or the same
+    spec listed twice) apart.
+    """
+    spec_name = os.path.splitext(os.path.basename(spec_path))[0]
+    return os.path.abspath(os.path.join(output_root, f"{index:02d}-{spec_name}"))
+
+
+def run_spec(spec_path: str, index: int, output_root: str) -> Dict[str, Any]:
+    """
+    Run the crew for one spec in the current process and summarise the outcome.
+
+    Files are written under spec_output_dir() instead of the default
+    WriteFileTool.BASE_DIR, so concurrent runs never collide.
+    """
+    output_dir = spec_output_dir(spec_path, index, output_root)
+    summary: Dict[str, Any] = {"spec": spec_path, "index": index, "output_dir": output_dir}
+    started = time.perf_counter()
+
+    try:
+        inputs = load_spec(spec_path)
+        summary["app_name"] = inputs["app_name"]
+
+        os.makedirs(output_dir, exist_ok=True)
+        os.environ[OUTPUT_DIR_ENV] = output_dir
+
+        # Imported here so a bad spec never pays for loading crewai.
+        from design_to_dev_crew.scheduler import run_crew
+
+        checkpoint = RunCheckpoint.create(inputs)
+        summary["run_id"] = checkpoint.run_id
+        result = run_crew(checkpoint)
+
+        summary["status"] = "completed"
+        summary["token_usage"] = result.token_usage.model_dump() if result.token_usage else {}
+    except Exception as e:
+        summary["status"] = "failed"
+        summary["error"] = f"{type(e).__name__}: {e}"
+
+    summary["duration_s"] = round(time.perf_counter() - started, 1)
+    return summary
+
+
+def run_batch(
+    spec_paths: List[str],
+    output_root: str,
+    parallelism: int = DEFAULT_PARALLELISM,
+) -> List[Dict[str, Any]]:
+    """
+    Run many specs concurrently with a process pool and write a summary report
+    to `<output_root>/batch_report.json`.
+
+    Each worker process handles a single spec (max_tasks_per_child=1), so
+    per-run environment such as the output directory never leaks between runs.
+    A worker that dies (BrokenProcessPool, unpicklable result, ...) is recorded
+    as a failed run; the report is always written.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+
+    with ProcessPoolExecutor(max_workers=max(1, parallelism), max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(run_spec, path, index, output_root): (index, path)
+            for index, path in enumerate(spec_paths)
+        }
+        for future in as_completed(futures):
+            index, path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {
+                    "spec": path,
+                    "index": index,
+                    "output_dir": spec_output_dir(path, index, output_root),
+                    "status": "failed",
+                    "error": f"{type(e).__name__}: {e}",
+                    "duration_s": round(time.perf_counter() - started, 1),
+                }
+            print(f"[batch] {summary['spec']}: {summary['status']} in {summary['duration_s']}s")
+            results.append(summary)
+
+    results.sort(key=lambda r: r["index"])
+    report = {
+        "started_at": started_at,
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "parallelism": parallelism,
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "runs": results,
+    }
+    with open(os.path.join(output_root, "batch_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    return results
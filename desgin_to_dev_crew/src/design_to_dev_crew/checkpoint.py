@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai import Task
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+
+from design_to_dev_crew.tools.file_writer import default_base_dir, recorded_bytes, write_bytes_atomic
+
+DEFAULT_RUNS_DIR = os.getenv("CREW_RUNS_DIR", "runs")
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Write JSON via temp file + rename so a crash never leaves a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class RunCheckpoint:
+    """
+    Durable per-task checkpoints for one crew run.
+
+    Layout of a run directory:
+
+        runs/<run_id>/run.json          inputs + status
+        runs/<run_id>/tasks/<task>.json output, token usage and files written
+        runs/<run_id>/files/<sha256>    copy of every file written by WriteFileTool
+
+    A task's checkpoint is written as soon as the task finishes, so a crash,
+    rate limit or Ctrl-C later in the run loses at most the tasks in flight.
+    """
+
+    def __init__(self, run_dir: str) -> None:
+        self.run_dir = os.path.abspath(run_dir)
+        self.run_id = os.path.basename(self.run_dir)
+        with open(os.path.join(self.run_dir, "run.json"), encoding="utf-8") as f:
+            self.meta: Dict[str, Any] = json.load(f)
+
+    # --- Creating / finding runs -------------------------------------------
+
+    @classmethod
+    def create(cls, inputs: Dict[str, str], runs_dir: str = DEFAULT_RUNS_DIR) -> "RunCheckpoint":
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        run_dir = os.path.join(runs_dir, run_id)
+        _write_json(os.path.join(run_dir, "run.json"), {
+            "run_id": run_id,
+            "created_at": _now(),
+            "status": "running",
+            "inputs": inputs,
+            # Resolved now (DESIGN_TO_DEV_OUTPUT_DIR, e.g. set per spec by batch mode) so a
+            # resumed run writes its remaining files to the same place.
+            "output_dir": default_base_dir(),
+        })
+        return cls(run_dir)
+
+    @classmethod
+    def load(cls, run_id: str, runs_dir: str = DEFAULT_RUNS_DIR) -> "RunCheckpoint":
+        return cls(os.path.join(runs_dir, run_id))
+
+    @staticmethod
+    def exists(run_id: str, runs_dir: str = DEFAULT_RUNS_DIR) -> bool:
+        return os.path.isfile(os.path.join(runs_dir, run_id, "run.json"))
+
+    @classmethod
+    def latest_incomplete(cls, runs_dir: str = DEFAULT_RUNS_DIR) -> Optional["RunCheckpoint"]:
+        """Most recent run that has not finished, if any."""
+        if not os.path.isdir(runs_dir):
+            return None
+        for run_id in sorted(os.listdir(runs_dir), reverse=True):
+            if not cls.exists(run_id, runs_dir):
+                continue
+            run = cls.load(run_id, runs_dir)
+            if run.meta.get("status") != "completed":
+                return run
+        return None
+
+    @property
+    def inputs(self) -> Dict[str, str]:
+        return self.meta["inputs"]
+
+    @property
+    def output_dir(self) -> Optional[str]:
+        """Output root of the run's files (None for runs created before it was recorded)."""
+        return self.meta.get("output_dir")
+
+    def mark_completed(self) -> None:
+        self.meta.update(status="completed", completed_at=_now())
+        _write_json(os.path.join(self.run_dir, "run.json"), self.meta)
+
+    # --- Per-task checkpoints ----------------------------------------------
+
+    def _task_path(self, task_name: str) -> str:
+        return os.path.join(self.run_dir, "tasks", f"{task_name}.json")
+
+    def _file_copy_path(self, sha256: str) -> str:
+        return os.path.join(self.run_dir, "files", sha256)
+
+    def save_task(
+        self,
+        task: Task,
+        output: TaskOutput,
+        files: List[Dict[str, Any]],
+        usage: Dict[str, Any],
+        contents: Optional[Dict[str, bytes]] = None,
+    ) -> None:
+        """
+        Checkpoint a finished task. File copies come from `contents` (the bytes
+        captured when each file was written), else from disk if still unchanged.
+        """
+        for record in files:
+            copy_path = self._file_copy_path(record["sha256"])
+            if os.path.exists(copy_path):
+                continue
+            data = recorded_bytes(record, contents)
+            if data is not None:
+                write_bytes_atomic(copy_path, data)
+
+        _write_json(self._task_path(task.name), {
+            "task": task.name,
+            "agent": output.agent,
+            "raw": output.raw,
+            "usage": usage,
+            "files": files,
+            "completed_at": _now(),
+        })
+
+    def load_task(self, task: Task) -> Optional[Tuple[TaskOutput, List[Dict[str, Any]]]]:
+        """
+        Return the checkpointed output of `task` and its file records, or None
+        if it did not complete.
+
+        Files the task wrote are restored from the run directory if they have
+        since been deleted or overwritten.
+        """
+        try:
+            with open(self._task_path(task.name), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for record in entry.get("files", []):
+            self._restore_file(record)
+
+        output = TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=entry["raw"],
+            agent=entry.get("agent") or task.agent.role,
+            output_format=OutputFormat.RAW,
+        )
+        return output, entry.get("files", [])
+
+    def _restore_file(self, record: Dict[str, Any]) -> None:
+        path = record["path"]
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == record["sha256"]:
+                    return
+        copy_path = self._file_copy_path(record["sha256"])
+        if os.path.exists(copy_path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(copy_path, path)
@@ -0,0 +1,102 @@
+import os
+import re
+from typing import Dict, List
+
+# Upper bound on the size of one task's digest, so downstream prompts stay bounded
+# no matter how much an upstream agent wrote.
+DEFAULT_MAX_CHARS = int(os.getenv("CREW_DIGEST_MAX_CHARS", "6000"))
+
+# Max signature lines listed per written file.
+MAX_SIGNATURES_PER_FILE = 15
+
+_HEADING = re.compile(r"^\s{0,3}#{1,4}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_ENDPOINT = re.compile(r"\b(GET|POST|PUT|PATCH|DELETE)\s+`?(/[\w/{}\-.:]*)")
+_TYPE_DECLARATION = re.compile(r"\b(?:class|interface|enum|record)\s+([A-Z]\w+)")
+_TYPE_NAME = re.compile(
+    r"\b([A-Z]\w*(?:Controller|Service|Repository|Dto|DTO|Request|Response|Entity|Config|Mapper))\b"
+)
+
+_JAVA_SIGNATURES = [
+    re.compile(r"^\s*@(?:Get|Post|Put|Patch|Delete|Request)Mapping\b.*"),
+    re.compile(r"^\s*(?:public|protected)\s+[^=;{]*?\b(?:class|interface|enum|record)\s+\w+[^{]*"),
+    re.compile(r"^\s*(?:public|protected)\s+[\w<>\[\],.? ]+\s+\w+\s*\([^)]*\)"),
+]
+_JS_SIGNATURES = [
+    re.compile(r"^\s*export\s+(?:default\s+)?(?:async\s+)?(?:function|class|const|let)\s*\*?\s*\w+[^{=]*"),
+]
+SIGNATURE_PATTERNS = {
+    ".java": _JAVA_SIGNATURES,
+    ".js": _JS_SIGNATURES,
+    ".jsx": _JS_SIGNATURES,
+    ".ts": _JS_SIGNATURES,
+    ".tsx": _JS_SIGNATURES,
+    ".vue": _JS_SIGNATURES,
+}
+
+
+def _unique(items: List[str], limit: int) -> List[str]:
+    seen: Dict[str, None] = {}
+    for item in items:
+        seen.setdefault(item, None)
+    return list(seen)[:limit]
+
+
+def file_signatures(path: str) -> List[str]:
+    """Class/method/endpoint/export signature lines of a written source file."""
+    patterns = SIGNATURE_PATTERNS.get(os.path.splitext(path)[1].lower())
+    if not patterns or not os.path.isfile(path):
+        return []
+
+    signatures: List[str] = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if any(p.match(line) for p in patterns):
+                signatures.append(line.strip().rstrip("{").strip()[:160])
+                if len(signatures) >= MAX_SIGNATURES_PER_FILE:
+                    break
+    return signatures
+
+
+def build_digest(
+    task_name: str,
+    raw: str,
+    files: List[Dict],
+    max_chars: int = DEFAULT_MAX_CHARS,
+) -> str:
+    """
+    Compact structured digest of one task's output for downstream tasks.
+
+    - Design/test-plan style output becomes an index of section headings,
+      REST endpoints and class/DTO names.
+    - Files the task wrote become a manifest (path, size) with their
+      class/method/export signatures.
+
+    The full text of any listed file can be fetched with the read_file tool.
+    """
+    headings = _unique(_HEADING.findall(raw), 40)
+    endpoints = _unique([f"{verb} {path}" for verb, path in _ENDPOINT.findall(raw)], 60)
+    types = _unique(_TYPE_DECLARATION.findall(raw) + _TYPE_NAME.findall(raw), 80)
+
+    lines = [f"## Digest of `{task_name}`"]
+    if headings:
+        lines.append("Sections: " + " | ".join(headings))
+    if endpoints:
+        lines.append("Endpoints:")
+        lines.extend(f"- {e}" for e in endpoints)
+    if types:
+        lines.append("Types: " + ", ".join(types))
+
+    if files:
+        lines.append("Files written (use read_file to see full content):")
+        for record in files:
+            lines.append(f"- {record['path']} ({record.get('bytes', '?')} bytes)")
+            lines.extend(f"    {sig}" for sig in file_signatures(record["path"]))
+
+    if len(lines) == 1:
+        # Nothing structured to extract: fall back to the start of the text.
+        lines.append(raw[:max_chars])
+
+    digest = "\n".join(lines)
+    if len(digest) > max_chars:
+        digest = digest[:max_chars] + "\n[... digest truncated]"
+    return digest
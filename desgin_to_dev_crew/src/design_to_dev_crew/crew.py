@@ -3,7 +3,8 @@ from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
 
-from design_to_dev_crew.tools.file_writer import WriteFileTool
+from design_to_dev_crew.tools.file_reader import ReadFileTool
+from design_to_dev_crew.tools.file_writer import WriteFileTool, WriteFilesTool
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
@@ -23,7 +24,7 @@ class DesignToDevCrew():
     def development_lead(self) -> Agent:
         return Agent(
             config=self.agents_config["development_lead"],
-            tools=[WriteFileTool()],
+            tools=[WriteFileTool(), WriteFilesTool(), ReadFileTool()],
             verbose=True,
         )
 
@@ -31,7 +32,7 @@ class DesignToDevCrew():
     def backend_developer(self) -> Agent:
         return Agent(
             config=self.agents_config["backend_developer"],
-            tools=[WriteFileTool()],
+            tools=[WriteFileTool(), WriteFilesTool(), ReadFileTool()],
             verbose=True,
         )
 
@@ -39,7 +40,7 @@ class DesignToDevCrew():
     def frontend_developer(self) -> Agent:
         return Agent(
             config=self.agents_config["frontend_developer"],
-            tools=[WriteFileTool()],
+            tools=[WriteFileTool(), WriteFilesTool(), ReadFileTool()],
             verbose=True,
         )
 
@@ -47,7 +48,7 @@ class DesignToDevCrew():
     def tester(self) -> Agent:
         return Agent(
             config=self.agents_config["tester"],
-            tools=[WriteFileTool()],
+            tools=[WriteFileTool(), WriteFilesTool(), ReadFileTool()],
             verbose=True,
         )
 
@@ -55,6 +56,7 @@ class DesignToDevCrew():
     def peer_reviewer(self) -> Agent:
         return Agent(
             config=self.agents_config["peer_reviewer"],
+            tools=[ReadFileTool()],
             verbose=True,
         )
 
@@ -102,12 +104,14 @@ class DesignToDevCrew():
         """
         Creates the design to dev crew.
 
-        Task order is sequential:
+        Task dependencies are declared via `context` in config/tasks.yaml:
         1) design_backend_frontend
-        2) implement_backend
-        3) implement_frontend
-        4) create_test_plan
-        5) peer_review_solution
+        2) implement_backend, implement_frontend, create_test_plan
+           (each only needs the design; marked async_execution so they overlap)
+        3) peer_review_solution (joins all of the above)
+
+        main.run() executes this graph with design_to_dev_crew.scheduler.TaskScheduler,
+        which adds a concurrency cap; `crew.kickoff()` still works as well.
         """
         return Crew(
             agents=self.agents,   # auto-collected from @agent methods
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai import Task
+
+
+@dataclass
+class TaskStats:
+    """Timing, LLM, tool and file-write figures for one task of a run."""
+
+    task: str
+    agent: str
+    source: str = "pending"        # llm | cache | checkpoint
+    queued_s: float = 0.0          # waiting for a concurrency slot
+    wall_s: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    usage_available: bool = True   # False when crewai did not expose token counts
+    tool_calls: Dict[str, int] = field(default_factory=dict)
+    files_written: int = 0
+    files_unchanged: int = 0
+    bytes_written: int = 0
+
+
+class RunRecorder:
+    """
+    Collects per-task instrumentation for a crew run.
+
+    - Wall time and queueing delay come from the scheduler.
+    - Tool calls are counted from each agent's step callback.
+    - LLM calls and tokens are deltas of the agent LLM's token usage summary
+      (shown as n/a when crewai does not expose one).
+    - Files and bytes written come from the WriteFileTool write records.
+
+    At the end of the run, `write()` saves `report.json` and a human-readable
+    `report.txt` table.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._ready_at: Dict[str, float] = {}
+        self._running_since: Dict[str, float] = {}
+        self.tasks: Dict[str, TaskStats] = {}
+
+    # --- Hooks --------------------------------------------------------------
+
+    def attach(self, task: Task) -> None:
+        """Wrap the task agent's step callback to count tool calls for `task`."""
+        agent = task.agent
+        previous: Optional[Callable[[Any], Any]] = agent.step_callback
+        self.tasks[task.name] = TaskStats(task=task.name, agent=agent.role.strip())
+
+        def on_step(step: Any) -> None:
+            tool = getattr(step, "tool", None)
+            if tool:
+                with self._lock:
+                    calls = self.tasks[task.name].tool_calls
+                    calls[tool] = calls.get(tool, 0) + 1
+            if previous is not None:
+                previous(step)
+
+        agent.step_callback = on_step
+
+    def task_ready(self, task_name: str) -> None:
+        """All dependencies done; the task now waits for a concurrency slot."""
+        self._ready_at[task_name] = time.perf_counter()
+
+    def task_started(self, task_name: str) -> None:
+        now = time.perf_counter()
+        self._running_since[task_name] = now
+        self.tasks[task_name].queued_s = round(now - self._ready_at.get(task_name, now), 2)
+
+    def task_finished(
+        self,
+        task_name: str,
+        source: str,
+        files: List[Dict[str, Any]],
+        usage: Optional[Dict[str, Any]],
+    ) -> None:
+        with self._lock:
+            stats = self.tasks[task_name]
+            stats.source = source
+            stats.wall_s = round(time.perf_counter() - self._running_since[task_name], 2)
+            if source != "llm":
+                # Replayed: nothing was generated or written in this run.
+                return
+            if usage is None:
+                stats.usage_available = False
+                usage = {}
+            stats.llm_calls = usage.get("successful_requests", 0)
+            stats.prompt_tokens = usage.get("prompt_tokens", 0)
+            stats.completion_tokens = usage.get("completion_tokens", 0)
+            stats.total_tokens = usage.get("total_tokens", 0)
+            written = [f for f in files if f.get("status", "written") == "written"]
+            stats.files_written = len(written)
+            stats.files_unchanged = len(files) - len(written)
+            stats.bytes_written = sum(f.get("bytes", 0) for f in written)
+
+    # --- Reporting ----------------------------------------------------------
+
+    def report(self) -> Dict[str, Any]:
+        tasks = [asdict(stats) for stats in self.tasks.values()]
+        totals = Counter()
+        for t in tasks:
+            for key in ("llm_calls", "prompt_tokens", "completion_tokens", "total_tokens",
+                        "files_written", "bytes_written"):
+                totals[key] += t[key]
+            totals["tool_calls"] += sum(t["tool_calls"].values())
+        bottleneck = max(tasks, key=lambda t: t["wall_s"], default=None)
+        return {
+            "wall_s": round(time.perf_counter() - self._started, 2),
+            "totals": dict(totals),
+            "bottleneck": bottleneck["task"] if bottleneck else None,
+            "tasks": tasks,
+        }
+
+    def table(self) -> str:
+        header = (
+            f"{'task':<24} {'source':<10} {'queued':>7} {'wall':>8} {'llm':>4} "
+            f"{'tok in':>8} {'tok out':>8} {'tools':>5} {'files':>5} {'bytes':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for s in self.tasks.values():
+            llm, tok_in, tok_out = (
+                (s.llm_calls, s.prompt_tokens, s.completion_tokens) if s.usage_available else ("n/a",) * 3
+            )
+            lines.append(
+                f"{s.task:<24} {s.source:<10} {s.queued_s:>6.1f}s {s.wall_s:>7.1f}s {llm:>4} "
+                f"{tok_in:>8} {tok_out:>8} {sum(s.tool_calls.values()):>5} "
+                f"{s.files_written:>5} {s.bytes_written:>9}"
+            )
+        report = self.report()
+        lines.append("-" * len(header))
+        lines.append(f"total wall time {report['wall_s']:.1f}s, slowest task: {report['bottleneck']}")
+        return "\n".join(lines)
+
+    def write(self, run_dir: str) -> str:
+        """Write report.json and report.txt into `run_dir`; returns the JSON path."""
+        os.makedirs(run_dir, exist_ok=True)
+        json_path = os.path.join(run_dir, "report.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(os.path.join(run_dir, "report.txt"), "w", encoding="utf-8") as f:
+            f.write(self.table() + "\n")
+        return json_path
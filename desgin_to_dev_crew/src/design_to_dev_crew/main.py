@@ -1,10 +1,13 @@
 #!/usr/bin/env python
+import argparse
 import sys
 import warnings
 
 from datetime import datetime
 
-from design_to_dev_crew.crew import DesignToDevCrew
+from design_to_dev_crew.batch import DEFAULT_PARALLELISM, run_batch
+from design_to_dev_crew.checkpoint import DEFAULT_RUNS_DIR, RunCheckpoint
+from design_to_dev_crew.scheduler import run_crew
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -101,12 +104,44 @@ def run():
     print("\nKicking off crew with:")
     for k, v in inputs.items():
         print(f"  {k}: {v}")
-    print("\nRunning crew... this may take a little while.\n" + "-" * 60)
 
     # ---- Run the crew ------------------------------------------------------
 
-    crew = DesignToDevCrew().crew()
-    result = crew.kickoff(inputs=inputs)
+    _kickoff(RunCheckpoint.create(inputs))
+
+
+def resume() -> None:
+    """
+    Resume an unfinished run from its checkpoints.
+
+    Usage: resume [run_id]   (defaults to the most recent unfinished run)
+
+    Tasks that completed in that run are restored from the run directory
+    (including the files they wrote); only incomplete tasks are executed, and
+    they write to the run's original output directory (see run_crew).
+    """
+    if len(sys.argv) > 1:
+        if not RunCheckpoint.exists(sys.argv[1]):
+            print(f"No such run: {sys.argv[1]} (no run.json under {DEFAULT_RUNS_DIR}/). Exiting.")
+            return
+        checkpoint = RunCheckpoint.load(sys.argv[1])
+    else:
+        checkpoint = RunCheckpoint.latest_incomplete()
+        if checkpoint is None:
+            print("No unfinished run found. Exiting.")
+            return
+
+    print(f"=== Resuming run {checkpoint.run_id} ===")
+    if checkpoint.output_dir:
+        print(f"Output directory: {checkpoint.output_dir}")
+    _kickoff(checkpoint)
+
+
+def _kickoff(checkpoint: RunCheckpoint) -> None:
+    print(f"\nRun id: {checkpoint.run_id} (checkpoints in {checkpoint.run_dir})")
+    print("Running crew... this may take a little while.\n" + "-" * 60)
+
+    result = run_crew(checkpoint)
 
     print("\n" + "=" * 60)
     print("FINAL RESULT")
@@ -115,6 +150,38 @@ def run():
     print("\nDone.")
 
 
+def batch() -> None:
+    """
+    Run many requirement specs through the crew, without any prompts.
+
+    Usage: batch SPEC [SPEC ...] [--parallel N] [--output-root DIR]
+
+    Each spec is a YAML/JSON file with `requirements` and optionally
+    `app_name`, `frontend_module_name`, `backend_module_name` and
+    `package_name_prefix`. Every spec gets its own output directory under
+    --output-root, and a summary report is written to
+    <output-root>/batch_report.json.
+    """
+    parser = argparse.ArgumentParser(prog="batch", description="Run many specs through the crew.")
+    parser.add_argument("specs", nargs="+", help="YAML/JSON spec files")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLELISM,
+                        help=f"max specs running at once (default {DEFAULT_PARALLELISM})")
+    parser.add_argument("--output-root", default="generated_batch",
+                        help="directory holding one output folder per spec")
+    args = parser.parse_args(sys.argv[1:])
+
+    print(f"=== DesignToDev Crew – batch of {len(args.specs)} spec(s), parallelism {args.parallel} ===")
+    results = run_batch(args.specs, args.output_root, args.parallel)
+
+    print("\n" + "=" * 60)
+    print("BATCH SUMMARY")
+    print("=" * 60)
+    for r in results:
+        detail = r.get("output_dir") if r["status"] == "completed" else r.get("error")
+        print(f"  {r['status']:<10} {r['duration_s']:>8}s  {r['spec']}  ->  {detail}")
+    print(f"\nReport: {args.output_root}/batch_report.json")
+
+
 def train() -> None:
     """
     Optional: training entrypoint if you want to use crew.train(...)
@@ -124,4 +191,9 @@ def train() -> None:
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    # python -m design_to_dev_crew.main [resume [run_id] | batch SPEC ...]
+    commands = {"resume": resume, "batch": batch}
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        commands[sys.argv.pop(1)]()
+    else:
+        run()
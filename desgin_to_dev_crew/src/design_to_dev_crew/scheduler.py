@@ -0,0 +1,289 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from design_to_dev_crew.checkpoint import RunCheckpoint
+from design_to_dev_crew.context_digest import build_digest
+from design_to_dev_crew.instrumentation import RunRecorder
+from design_to_dev_crew.task_cache import TaskCache
+from design_to_dev_crew.tools.file_writer import OUTPUT_DIR_ENV, WriteFileTool, default_base_dir
+
+# Upper bound on tasks running at the same time (each one is an LLM conversation).
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("CREW_MAX_CONCURRENCY", "3"))
+
+# Same separator CrewAI uses when it aggregates context from several tasks.
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+# "digest": downstream tasks get a compact digest of each upstream output (and can
+# read specific files on demand); "full": they get the raw upstream outputs.
+DEFAULT_CONTEXT_MODE = os.getenv("CREW_CONTEXT_MODE", "digest")
+
+
+log = logging.getLogger(__name__)
+
+
+def agent_token_usage(agent: Any) -> Optional[Dict[str, Any]]:
+    """
+    Cumulative token usage of an agent's LLM so far, or None if unavailable.
+
+    Uses the LLM's public usage summary (what Crew.calculate_usage_metrics()
+    sums) and only falls back to the agent's private token counter on crewai
+    versions without it.
+    """
+    summary = getattr(getattr(agent, "llm", None), "get_token_usage_summary", None)
+    if callable(summary):
+        return summary().model_dump()
+    token_process = getattr(agent, "_token_process", None)
+    if token_process is not None:
+        return token_process.get_summary().model_dump()
+    return None
+
+
+def usage_delta(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Usage between two agent_token_usage() snapshots (None if either is unavailable)."""
+    if before is None or after is None:
+        return None
+    return {
+        key: value - before.get(key, 0)
+        for key, value in after.items() if isinstance(value, (int, float))
+    }
+
+
+def task_file_writers(task: Task) -> List[WriteFileTool]:
+    """WriteFileTool instances a task can use (its own tools plus its agent's)."""
+    tools = list(task.tools or []) + list(getattr(task.agent, "tools", None) or [])
+    unique = {id(tool): tool for tool in tools if isinstance(tool, WriteFileTool)}
+    return list(unique.values())
+
+
+def task_output_root(task: Task) -> str:
+    """Directory (or directories) a task writes its files under."""
+    roots = sorted({tool.BASE_DIR for tool in task_file_writers(task)})
+    return os.pathsep.join(roots) if roots else default_base_dir()
+
+
+class TaskScheduler:
+    """
+    Runs the tasks of a crew as a dependency graph instead of a fixed sequence.
+
+    Dependencies are the task's `context` list, declared in config/tasks.yaml.
+    A task starts as soon as all of its dependencies have finished, and at most
+    `max_concurrency` tasks run at the same time. For the design-to-dev crew this
+    means:
+
+        design_backend_frontend
+          -> implement_backend | implement_frontend | create_test_plan  (in parallel)
+          -> peer_review_solution  (join)
+
+    With a `TaskCache`, tasks whose inputs are unchanged since a previous run are
+    replayed from disk instead of calling the LLM again. With a `RunCheckpoint`,
+    every finished task is checkpointed and tasks already checkpointed in that
+    run are skipped, which is how `main.resume()` picks up a failed run.
+
+    In "digest" context mode, downstream tasks receive a bounded digest of each
+    upstream output (see context_digest.py) instead of the full text.
+
+    With a `RunRecorder`, per-task timing, LLM calls, tokens, tool calls and
+    bytes written are recorded for the run report.
+    """
+
+    def __init__(
+        self,
+        crew: Crew,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[TaskCache] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        context_mode: str = DEFAULT_CONTEXT_MODE,
+        recorder: Optional[RunRecorder] = None,
+    ) -> None:
+        self.crew = crew
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.context_mode = context_mode
+        self.recorder = recorder
+        # Files each finished task wrote, keyed by task name (for digests).
+        self.files: Dict[str, List[Dict[str, Any]]] = {}
+        self.tasks: List[Task] = list(crew.tasks)
+        self.dependencies: Dict[str, List[str]] = self._build_graph(self.tasks)
+
+    # --- Graph --------------------------------------------------------------
+
+    @staticmethod
+    def _build_graph(tasks: List[Task]) -> Dict[str, List[str]]:
+        """
+        Map each task name to the names of the tasks it depends on.
+
+        Tasks are kept in declaration order, so every dependency must be declared
+        before the task that uses it (this also rules out cycles).
+        """
+        seen: set[str] = set()
+        graph: Dict[str, List[str]] = {}
+        for task in tasks:
+            context = task.context if isinstance(task.context, list) else []
+            deps = [dep.name for dep in context]
+            missing = [dep for dep in deps if dep not in seen]
+            if missing:
+                raise ValueError(
+                    f"Task '{task.name}' depends on {missing}, which must be declared before it"
+                )
+            graph[task.name] = deps
+            seen.add(task.name)
+        return graph
+
+    # --- Execution ----------------------------------------------------------
+
+    def kickoff(self, inputs: Dict[str, str]) -> CrewOutput:
+        """Blocking entry point, mirrors `Crew.kickoff(inputs=...)`."""
+        return asyncio.run(self.kickoff_async(inputs))
+
+    async def kickoff_async(self, inputs: Dict[str, str]) -> CrewOutput:
+        self._prepare(inputs)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        running: Dict[str, asyncio.Task] = {}
+
+        async def run(task: Task) -> TaskOutput:
+            upstream = await asyncio.gather(*(running[dep] for dep in self.dependencies[task.name]))
+            if self.recorder is not None:
+                self.recorder.task_ready(task.name)
+            async with semaphore:
+                return await asyncio.to_thread(self._execute, task, list(upstream))
+
+        for task in self.tasks:
+            running[task.name] = asyncio.create_task(run(task))
+
+        try:
+            outputs = await asyncio.gather(*running.values())
+        except BaseException:
+            for pending in running.values():
+                pending.cancel()
+            raise
+
+        final = outputs[-1]
+        return CrewOutput(
+            raw=final.raw,
+            pydantic=final.pydantic,
+            json_dict=final.json_dict,
+            tasks_output=list(outputs),
+            token_usage=self.crew.calculate_usage_metrics(),
+        )
+
+    def _prepare(self, inputs: Dict[str, str]) -> None:
+        """Do the parts of `Crew.kickoff` that tasks rely on when run on their own."""
+        self.crew._interpolate_inputs(inputs)
+        for agent in self.crew.agents:
+            agent.crew = self.crew
+            if self.crew.step_callback and not agent.step_callback:
+                agent.step_callback = self.crew.step_callback
+        for task in self.tasks:
+            if self.crew.task_callback and not task.callback:
+                task.callback = self.crew.task_callback
+            if self.recorder is not None:
+                self.recorder.attach(task)
+
+    def _context_for(self, upstream: List[TaskOutput]) -> str:
+        if self.context_mode == "full":
+            return CONTEXT_SEPARATOR.join(output.raw for output in upstream)
+        return CONTEXT_SEPARATOR.join(
+            build_digest(output.name, output.raw, self.files.get(output.name, []))
+            for output in upstream
+        )
+
+    def _execute(self, task: Task, upstream: List[TaskOutput]) -> TaskOutput:
+        if self.recorder is not None:
+            self.recorder.task_started(task.name)
+
+        before = agent_token_usage(task.agent)
+        restored = self.checkpoint.load_task(task) if self.checkpoint is not None else None
+        if restored is not None:
+            print(f"[checkpoint] {task.name}: already completed in run {self.checkpoint.run_id}")
+            (output, files), contents, source = restored, {}, "checkpoint"
+        else:
+            output, files, contents, source = self._execute_or_replay(task, upstream)
+
+        task.output = output
+        self.files[task.name] = files
+        usage: Optional[Dict[str, Any]] = {}
+        if source == "llm":
+            # Per-task figures are deltas of the agent's LLM counters; tasks running
+            # at the same time on one shared LLM instance split them only roughly.
+            usage = usage_delta(before, agent_token_usage(task.agent))
+            if usage is None:
+                log.warning("%s: token usage is not available from this crewai version", task.name)
+
+        if self.checkpoint is not None and source != "checkpoint":
+            self.checkpoint.save_task(task, output, files, usage or {}, contents)
+        if self.recorder is not None:
+            self.recorder.task_finished(task.name, source, files, usage)
+        return output
+
+    def _execute_or_replay(
+        self, task: Task, upstream: List[TaskOutput]
+    ) -> Tuple[TaskOutput, List[Dict[str, Any]], Dict[str, bytes], str]:
+        """
+        Returns (output, file records, written bytes by sha256, source) where
+        source is "cache" or "llm". Replayed files are already back on disk, so
+        their bytes are not returned.
+        """
+        context = self._context_for(upstream)
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.key_for(task, context, task_output_root(task))
+            cached = self.cache.get(task, key)
+            if cached is not None:
+                print(f"[cache] {task.name}: unchanged, replaying cached output")
+                return cached[0], cached[1], {}, "cache"
+
+        output = task.execute_sync(agent=task.agent, context=context, tools=task.tools)
+        files: List[Dict[str, Any]] = []
+        contents: Dict[str, bytes] = {}
+        for tool in task_file_writers(task):
+            records, written = tool.drain_writes()
+            files.extend(records)
+            contents.update(written)
+
+        if self.cache is not None:
+            self.cache.put(key, output, files, contents)
+        return output, files, contents, "llm"
+
+
+def run_crew(checkpoint: RunCheckpoint) -> CrewOutput:
+    """
+    Build the design-to-dev crew and run it for `checkpoint.inputs`.
+
+    Independent tasks run concurrently (cap: CREW_MAX_CONCURRENCY, default 3).
+    Tasks whose resolved prompt, upstream context and model are unchanged are
+    replayed from the on-disk cache (CREW_CACHE_DIR); set CREW_CACHE=false to
+    force a full regeneration. Files go to the output root recorded in the
+    run. Finished tasks are checkpointed in the run directory, a timing/token report is written next to them, and the run is
+    marked completed at the end.
+    """
+    # The file tools read their root when the crew is built: a resumed run must
+    # keep writing where it started (e.g. a batch spec's own directory).
+    if checkpoint.output_dir:
+        os.environ[OUTPUT_DIR_ENV] = checkpoint.output_dir
+
+    # Imported here: crew.py builds agents/tools and is only needed to run.
+    from design_to_dev_crew.crew import DesignToDevCrew
+
+    cache = TaskCache() if os.getenv("CREW_CACHE", "true").lower() == "true" else None
+    recorder = RunRecorder()
+    crew = DesignToDevCrew().crew()
+    scheduler = TaskScheduler(crew, cache=cache, checkpoint=checkpoint, recorder=recorder)
+    try:
+        result = scheduler.kickoff(inputs=checkpoint.inputs)
+    finally:
+        # Written even for failed runs: it shows where the time went before the failure.
+        report_path = recorder.write(checkpoint.run_dir)
+        print("\n" + recorder.table())
+        print(f"Run report: {report_path}")
+    checkpoint.mark_completed()
+    return result
+
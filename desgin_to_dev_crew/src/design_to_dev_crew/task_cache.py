@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from crewai import Task
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+
+from design_to_dev_crew.tools.file_writer import recorded_bytes, write_bytes_atomic
+
+# Bump to invalidate every cached entry (e.g. after changing how prompts are built).
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.getenv("CREW_CACHE_DIR", ".crew_cache")
+
+
+class TaskCache:
+    """
+    Content-addressed on-disk cache of task outputs.
+
+    The key is a hash of everything that determines what the LLM sees for a task:
+    the agent's role/goal/backstory and the task description/expected output
+    (after `{requirements}`, `{app_name}`, ... have been interpolated), the
+    context built from its upstream task outputs, the model name and the output
+    root the task's files go to. Changing one module's inputs therefore only
+    invalidates the tasks that actually depend on them.
+
+    Layout:
+
+        <cache_dir>/<kk>/<key>.json   output and records of the files written
+        <cache_dir>/files/<sha256>    copy of every file written by the task
+
+    Replaying an entry restores its files if they have since been deleted or
+    overwritten, the same way RunCheckpoint.load_task does.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = os.path.abspath(cache_dir)
+
+    @staticmethod
+    def key_for(task: Task, context: str, output_root: str) -> str:
+        agent = task.agent
+        material = {
+            "version": CACHE_VERSION,
+            "output_root": output_root,
+            "task": task.name,
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "model": getattr(agent.llm, "model", str(agent.llm)),
+            "context": context,
+        }
+        blob = json.dumps(material, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _file_copy_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, "files", sha256)
+
+    def get(self, task: Task, key: str) -> Optional[Tuple[TaskOutput, List[Dict]]]:
+        """
+        Return the cached output for `key` (as a TaskOutput) and its file records,
+        or None. A hit whose files cannot all be restored counts as a miss.
+        """
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for record in entry.get("files", []):
+            if not self._restore_file(record):
+                return None
+
+        output = TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=entry["raw"],
+            agent=task.agent.role,
+            output_format=OutputFormat.RAW,
+        )
+        return output, entry.get("files", [])
+
+    def put(
+        self,
+        key: str,
+        output: TaskOutput,
+        files: List[Dict],
+        contents: Optional[Dict[str, bytes]] = None,
+    ) -> None:
+        """
+        Store `output` atomically so a crash never leaves a half-written entry.
+
+        File copies come from `contents` (the bytes captured when each file was
+        written), since another task may have rewritten a file since.
+        """
+        for record in files:
+            copy_path = self._file_copy_path(record["sha256"])
+            if os.path.exists(copy_path):
+                continue
+            data = recorded_bytes(record, contents)
+            if data is not None:
+                write_bytes_atomic(copy_path, data)
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "task": output.name,
+            "raw": output.raw,
+            "files": files,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _restore_file(self, record: Dict) -> bool:
+        """Put the cached copy of `record` back in place; False if there is none."""
+        path = record["path"]
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == record["sha256"]:
+                    return True
+        try:
+            with open(self._file_copy_path(record["sha256"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        # Atomic: the cache is shared by concurrent batch runs.
+        write_bytes_atomic(path, data)
+        return True
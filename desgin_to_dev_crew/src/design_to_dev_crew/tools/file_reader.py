@@ -0,0 +1,44 @@
+import os
+
+from crewai.tools import BaseTool
+from pydantic import Field
+
+from design_to_dev_crew.tools.file_writer import default_base_dir, resolve_confined_path
+
+
+class ReadFileTool(BaseTool):
+    """
+    Tool to read back a file written earlier in the run, under the same
+    restricted project directory as WriteFileTool.
+
+    Downstream tasks only receive a compact digest of earlier outputs (see
+    context_digest.py); this tool lets an agent pull in the full text of a
+    specific file when it actually needs it.
+
+    Usage from the agent:
+      - Tool name: read_file
+      - Args:
+          path: relative path under {app_name}, e.g. "my-app/technical_design.md"
+    """
+    name: str = "read_file"
+    description: str = (
+        "Read a text file previously written under the local project 'generated' directory. "
+        "Takes a relative path (inside the generated folder), as listed in the context digest."
+    )
+
+    BASE_DIR: str = Field(default_factory=default_base_dir)
+
+    # Keep a single read from blowing up the prompt again.
+    MAX_CHARS: int = 40_000
+
+    def _run(self, path: str) -> str:
+        abs_path = resolve_confined_path(self.BASE_DIR, path)
+        if not os.path.isfile(abs_path):
+            return f"File not found: {path}"
+
+        with open(abs_path, encoding="utf-8", errors="replace") as f:
+            content = f.read(self.MAX_CHARS + 1)
+
+        if len(content) > self.MAX_CHARS:
+            return content[: self.MAX_CHARS] + f"\n\n[... truncated at {self.MAX_CHARS} characters]"
+        return content
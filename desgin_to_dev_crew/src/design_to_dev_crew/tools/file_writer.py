@@ -1,5 +1,74 @@
+import hashlib
+import json
 import os
+import tempfile
+from typing import Dict, List, Optional, Tuple, Type
+
 from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Your restricted base directory (shared by the file tools)
+DEFAULT_BASE_DIR = "/home/cmohite/projects/AgenticAIEngineering/generated1/"
+
+# Overrides DEFAULT_BASE_DIR, e.g. to give each batch run its own output root.
+OUTPUT_DIR_ENV = "DESIGN_TO_DEV_OUTPUT_DIR"
+
+
+def default_base_dir() -> str:
+    """Base directory for new tool instances (read when the tool is created)."""
+    base_dir = os.path.abspath(os.getenv(OUTPUT_DIR_ENV) or DEFAULT_BASE_DIR)
+    return os.path.join(base_dir, "")
+
+
+def resolve_confined_path(base_dir: str, path: str) -> str:
+    """Absolute path for `path` under `base_dir`, refusing anything outside it."""
+    # If the agent passes a relative path like "my-app/README.md",
+    # we join it to base_dir
+    # If they pass an absolute path, this still normalises & checks it.
+    raw_path = path
+
+    # Build an absolute path based on base_dir + provided path
+    abs_path = os.path.abspath(
+        os.path.join(base_dir, raw_path)
+        if not os.path.isabs(raw_path)
+        else raw_path
+    )
+
+    # 🔒 Restrict access to base_dir only (your requested check)
+    if not abs_path.startswith(base_dir):
+        raise PermissionError("Access restricted to project directory")
+
+    return abs_path
+
+
+def recorded_bytes(record: Dict, contents: Optional[Dict[str, bytes]] = None) -> Optional[bytes]:
+    """
+    Bytes a write record stands for: from `contents` (captured at write time) if
+    present, else from disk while the file still matches the record's sha256.
+    None if the file has since been changed or removed.
+    """
+    data = (contents or {}).get(record["sha256"])
+    if data is not None:
+        return data
+    try:
+        with open(record["path"], "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return data if hashlib.sha256(data).hexdigest() == record["sha256"] else None
+
+
+def write_bytes_atomic(path: str, data: bytes) -> None:
+    """Write via temp file + rename so readers never see a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 class WriteFileTool(BaseTool):
@@ -19,7 +88,47 @@ class WriteFileTool(BaseTool):
     )
 
     # Your restricted base directory
-    BASE_DIR: str = "/home/cmohite/projects/AgenticAIEngineering/generated1/"
+    BASE_DIR: str = Field(default_factory=default_base_dir)
+
+    # Files written (or found unchanged) by this tool instance since the last
+    # drain_writes() call, used by the scheduler to checkpoint what each task produced,
+    # and the bytes behind each record: the file itself may be rewritten before then.
+    _writes: List[Dict] = PrivateAttr(default_factory=list)
+    _contents: Dict[str, bytes] = PrivateAttr(default_factory=dict)
+
+    def drain_writes(self) -> Tuple[List[Dict], Dict[str, bytes]]:
+        """Return and forget the records of files written so far, and their bytes by sha256."""
+        writes, self._writes = self._writes, []
+        contents, self._contents = self._contents, {}
+        return writes, contents
+
+    def _resolve_path(self, path: str) -> str:
+        return resolve_confined_path(self.BASE_DIR, path)
+
+    def _write(self, abs_path: str, content: str) -> Dict:
+        """
+        Write `content` atomically (temp file + rename) and record it.
+
+        If the file already holds exactly this content it is left untouched.
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        record = {"path": abs_path, "sha256": digest, "bytes": len(data)}
+
+        if os.path.isfile(abs_path):
+            with open(abs_path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == digest:
+                    record["status"] = "unchanged"
+                    self._writes.append(record)
+                    self._contents[digest] = data
+                    return record
+
+        write_bytes_atomic(abs_path, data)
+
+        record["status"] = "written"
+        self._writes.append(record)
+        self._contents[digest] = data
+        return record
 
     def _run(self, path: str, content: str) -> str:
         """
@@ -27,29 +136,60 @@ class WriteFileTool(BaseTool):
         :param content: File content as a UTF-8 string
         :return: Confirmation message with the final absolute path
         """
-        # If the agent passes a relative path like "my-app/README.md",
-        # we join it to BASE_DIR
-        # If they pass an absolute path, this still normalises & checks it.
-        raw_path = path
+        result = self._write(self._resolve_path(path), content)
+        if result["status"] == "unchanged":
+            return f"File unchanged at {result['path']}"
+        return f"File written to {result['path']}"
+
+
+class FileSpec(BaseModel):
+    """One file for the write_files tool."""
+    path: str = Field(..., description="Relative path under {app_name}, e.g. 'my-app/backend/pom.xml'.")
+    content: str = Field(..., description="Full file content as a string.")
+
 
-        # Build an absolute path based on BASE_DIR + provided path
-        abs_path = os.path.abspath(
-            os.path.join(self.BASE_DIR, raw_path)
-            if not os.path.isabs(raw_path)
-            else raw_path
-        )
+class WriteFilesInput(BaseModel):
+    """Input schema for WriteFilesTool."""
+    files: List[FileSpec] = Field(..., description="All files to write in this call.")
 
-        BASE_DIR = self.BASE_DIR
 
-        # 🔒 Restrict writes to BASE_DIR only (your requested check)
-        if not abs_path.startswith(BASE_DIR):
-            raise PermissionError("Write restricted to project directory")
+class WriteFilesTool(WriteFileTool):
+    """
+    Tool to write many text files in a single call, under the same restricted
+    directory as WriteFileTool.
+
+    One call replaces dozens of write_file round trips (each a full LLM turn).
+    Every path is checked against BASE_DIR before anything is written, each
+    file is written atomically, files whose content is unchanged are skipped,
+    and a JSON manifest of the result is returned.
+
+    Usage from the agent:
+      - Tool name: write_files
+      - Args:
+          files: [{"path": "my-app/backend/src/Main.java", "content": "..."}, ...]
+    """
+    name: str = "write_files"
+    description: str = (
+        "Write several text files at once under the local project 'generated' directory. "
+        "Takes a list of {path, content} objects (paths relative to the generated folder) "
+        "and returns a manifest. Prefer this over write_file when creating more than one file."
+    )
+    args_schema: Type[BaseModel] = WriteFilesInput
+
+    def _run(self, files: List[Dict]) -> str:
+        specs = [FileSpec.model_validate(f) for f in files]
 
-        # Ensure parent directories exist
-        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        # Resolve (and confine) every path up front so a bad path writes nothing.
+        # If the same path appears more than once, the last entry wins.
+        targets: Dict[str, str] = {}
+        for spec in specs:
+            targets[self._resolve_path(spec.path)] = spec.content
 
-        # Write file
-        with open(abs_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        manifest = [self._write(abs_path, content) for abs_path, content in targets.items()]
+        written = sum(1 for entry in manifest if entry["status"] == "written")
 
-        return f"File written to {abs_path}"
+        return json.dumps({
+            "written": written,
+            "unchanged": len(manifest) - written,
+            "files": manifest,
+        }, indent=2)